@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from openai import OpenAI
-import numpy as np
-import plotly.graph_objects as go
+import io
+import os
+
+from PIL import Image
+
+from assistant import (AnswerCache, BM25Index, ChatContext, extractive_summary, format_sections, load_pdf_sections,
+                       replay, split_sections)
+from attribution import (DEMO_DIMENSIONS, AttributionCube, beam_search, decompose_aggregates, decompose_rate_mix,
+                         demo_events, format_path, summarize_effects)
 
 # -----------------------------------------------------------------------------
 # 0. 简历数据 (System Prompt Context)
@@ -44,6 +49,13 @@ Python, SQL (Advanced), Tableau, Power BI, GenAI/LLM, ETL, Anomaly Detection.
 """
 
 
+# Chat 上下文的 token 预算 (System Prompt + 历史摘要 + 最近几轮对话)
+CHAT_TOKEN_BUDGET = 3000
+# 每个问题检索的简历段落数；是否把 materials/resume.pdf 也加入索引 (需要 pypdf)
+RETRIEVAL_TOP_K = 2
+INDEX_RESUME_PDF = False
+
+
 # -----------------------------------------------------------------------------
 # 1. 页面配置 
 # -----------------------------------------------------------------------------
@@ -54,12 +66,44 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# -----------------------------------------------------------------------------
+# 静态资源缓存 (Asset Cache)
+# -----------------------------------------------------------------------------
+# 每次 rerun (每条聊天消息、每次点击) 都会重跑整个脚本。头像缩略图和 PDF 字节只在进程内
+# 读取 / 渲染一次；缓存键带上文件修改时间，替换 materials/ 中的文件后会自动失效。
+def file_version(path):
+    """Modification time used as cache key, or None when the file is missing."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@st.cache_data(show_spinner=False)
+def load_thumbnail(path, width, version):
+    """PNG bytes of the image downscaled to 2x the display width (sharp on high-DPI screens)."""
+    with Image.open(path) as image:
+        image.thumbnail((width * 2, image.height))
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def load_file_bytes(path, version):
+    """Raw bytes of a file, read once per version."""
+    with open(path, "rb") as file:
+        return file.read()
+
+
 # -----------------------------------------------------------------------------
 # 2. 侧边栏：个人信息 (Sidebar)
 # -----------------------------------------------------------------------------
 with st.sidebar:
 
-    st.image("materials/selfie.png", width=150)
+    selfie_version = file_version("materials/selfie.png")
+    if selfie_version is not None:
+        st.image(load_thumbnail("materials/selfie.png", 150, selfie_version), width=150)
 
     st.title("Shuyue Hou")
     st.markdown("**Machine Learning Engineer @ Pingan Bank**")
@@ -77,15 +121,15 @@ with st.sidebar:
     st.divider()
 
     # 简历下载
-    try:
-        with open("materials/resume.pdf", "rb") as pdf_file:
-            st.download_button(
-                label="📄 Download PDF Resume",
-                data=pdf_file,
-                file_name="Shuyue_Hou_Resume.pdf",
-                mime="application/pdf"
-            )
-    except FileNotFoundError:
+    resume_version = file_version("materials/resume.pdf")
+    if resume_version is not None:
+        st.download_button(
+            label="📄 Download PDF Resume",
+            data=load_file_bytes("materials/resume.pdf", resume_version),
+            file_name="Shuyue_Hou_Resume.pdf",
+            mime="application/pdf"
+        )
+    else:
         st.warning("⚠️ Resume file not found in materials/")
 
 # -----------------------------------------------------------------------------
@@ -105,330 +149,483 @@ st.markdown("""
 # -----------------------------------------------------------------------------
 # 4. 核心内容分栏 (Tabs)
 # -----------------------------------------------------------------------------
-tab1, tab2, tab3 = st.tabs(["🚀 Experience & Skills", "✨ Chat with My Resume", "📈 Interactive Analysis"])
+# 只执行当前打开的 tab：切换 tab 会触发 rerun，未打开的 tab 不跑任何代码 (也不导入 openai / plotly)
+# (st.tabs 的 key / on_change 和 TabContainer.open 需要 Streamlit >= 1.55)
+tab1, tab2, tab3 = st.tabs(["🚀 Experience & Skills", "✨ Chat with My Resume", "📈 Interactive Analysis"],
+                           key="active_tab", on_change="rerun")
 
 # =============================================================================
 # TAB 1: 简历深度解析 (Experience & Skills)
 # =============================================================================
-with tab1:
-    # --- 第一部分：技能矩阵 (针对 JD 优化) ---
-    st.header("🛠️ Technical Arsenal")
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("#### 💻 Programming & Data")
-        st.write("✅ **Python**")
-        st.write("✅ **SQL**")
-        st.write("✅ **Java & Data Cleaning & Git**")
-
-    with col2:
-        st.markdown("#### 📊 Visualization & BI")
-        st.write("✅ **Tableau & Power BI**")
-        st.write("✅ **GenAI Automated Reporting**")
-        st.write("✅ **Excel (VBA, Pivot Tables)**")
-
-    with col3:
-        st.markdown("#### 🧠 Analytics & AI")
-        st.write("✅ **Statistics Background**")  # JD Keyword
-        st.write("✅ **A/B Testing & Anomaly Detection**")
-        st.write("✅ **LLM / Agent Development**")
-
-    st.divider()
+if tab1.open:
+    with tab1:
+        # --- 第一部分：技能矩阵 (针对 JD 优化) ---
+        st.header("🛠️ Technical Arsenal")
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.markdown("#### 💻 Programming & Data")
+            st.write("✅ **Python**")
+            st.write("✅ **SQL**")
+            st.write("✅ **Java & Data Cleaning & Git**")
+
+        with col2:
+            st.markdown("#### 📊 Visualization & BI")
+            st.write("✅ **Tableau & Power BI**")
+            st.write("✅ **GenAI Automated Reporting**")
+            st.write("✅ **Excel (VBA, Pivot Tables)**")
+
+        with col3:
+            st.markdown("#### 🧠 Analytics & AI")
+            st.write("✅ **Statistics Background**")  # JD Keyword
+            st.write("✅ **A/B Testing & Anomaly Detection**")
+            st.write("✅ **LLM / Agent Development**")
+
+        st.divider()
+
+        # --- 第二部分：职业经历 (Professional Experience) ---
+        st.header("🏢 Professional Experience")
+
+        # 经历 1: Pingan Bank
+        with st.container():
+            st.subheader("Machine Learning Engineer | Pingan Bank Co.,Ltd.")
+            st.caption("Aug 2025 - Present (Full Time) | Shenzhen")
+
+            st.markdown("""
+            *   **Business Driver & Root Cause Analysis:** Developed a Rate/Mix decomposition engine to **quantify drivers** behind CTR/CVR fluctuations for **￥10B+ campaigns**. Reduced anomaly diagnosis time from days to hours.
+            *   **GenAI-powered Dashboard:** Designed an **LLM-Agent dashboard** that auto-generates diagnostic reports, slashing reporting time by **98%**. 
+            *   **Data Pipeline (ETL):** Engineered a robust **Source-ETL-Model pipeline** (SQL & Python) to resolve T0/T1 data alignment, ensuring **100% data integrity** for attribution models.
+            """)
+            st.success("💡 **Impact:** Solved the 'Business-Technology Challenge' by automating manual diagnostics with GenAI.")
+
+        # 经历 2: Xiaohongshu
+        with st.container():
+            st.subheader("Data Analyst | Xiaohongshu (RED)")
+            st.caption("Dec 2023 - May 2024 (Intern) | Beijing")
+
+            st.markdown("""
+            *   **Strategic Bidding (SQL):** Analyzed **300,000+ user search behaviors using SQL**. Identified long-tail keywords to optimize budget allocation.
+            *   **Business Impact:** Drove a **25% increase in ROAS** and 18% growth in sales volume by capturing niche user intent.
+            *   **Dashboarding:** Developed automated **Power BI dashboards** to visualize real-time metrics (CTR, CVR, CPA), reducing reporting time by 50%.
+            """)
+            st.success("💡 **Impact:** Demonstrated data-driven growth capability by translating user behavior insights into bidding strategies that significantly improved ROAS and revenue.")
+
+        st.divider()
+
+        # --- 创业经历 (Entrepreneurship) ---
+        st.header("🚀 Entrepreneurship Experience")
+
+        with st.container():
+            st.subheader("Co-founder | OfferLah (Startup)")
+            st.caption("Feb 2025 - Present | Singapore")
+
+            st.markdown("""
+            *   **Operational System Design & Automation:** Spearheaded the migration from **manual spreadsheets to an automated scheduling ecosystem**. Established a centralized data tracking system that **reduced admin overhead by 40%**.
+            *   **Funnel Analysis & User Growth:** Defined full-funnel conversion metrics. Identified a **15% drop-off** at the service inquiry stage using data visualization, prompting a UI/UX redesign that improved the **Lead-to-Customer conversion rate by 20%**.
+            """)
+            st.success(
+                "💡 **Impact:** Demonstrated full-cycle ability from defining metrics -> identifying problems -> implementing solutions.")
+
+        st.divider()
+
+        # --- 第四部分：项目 (Projects) ---
+        st.header("📂 Key Projects")
+
+        col_p1, col_p2 = st.columns(2)
+
+        with col_p1:
+            st.markdown("**💰 Financial Transaction Risk Dashboard**")
+            st.markdown("*Tableau, LOD Expressions, Pareto Analysis*")
+            st.markdown(
+                "Identified **anomalies and high-risk transactions** using dynamic thresholding. Solved resource allocation challenges.")
+            st.markdown("[🔗 View Dashboard](https://public.tableau.com/app/profile/shuyue.hou)")
+
+        with col_p2:
+            st.markdown("**📝 Ensemble Text Classification System**")
+            st.markdown("*Python, Scikit-Learn, NLP, TF-IDF*")
+            st.markdown(
+                "Engineered a text processing pipeline and implemented **AHP (Analytic Hierarchy Process)** to improve precision/recall to over 85%.")
+            st.markdown("[🔗 View GitHub](https://github.com/sHellzip/question_pair)")
 
-    # --- 第二部分：职业经历 (Professional Experience) ---
-    st.header("🏢 Professional Experience")
+# =============================================================================
+# TAB 2: AI Chat (Doubao / Volcengine Integration)
+# =============================================================================
+if tab2.open:
+    with tab2:
+        st.header("✨ Chat with My Resume")
+        st.caption("Powered by Doubao (Volcengine) LLM")
+
+        # -------------------------------------------------------------------------
+        # 1. 初始化 API Client
+        # -------------------------------------------------------------------------
+        # 为了演示方便，暂时直接在这里填 Key。
+        # 正式部署时建议使用 st.secrets["ARK_API_KEY"]
+        try:
+            my_api_key = st.secrets["ARK_API_KEY"]
+        except FileNotFoundError:
+            st.error("⚠️ API Key 未找到。请在本地配置 .streamlit/secrets.toml 或在云端配置 Secrets。")
+            st.stop()
+
+        if not my_api_key:
+            st.warning("⚠️ Please provide a valid API Key in the code to activate the chatbot.")
+        else:
+            # openai SDK 导入较慢，只在第一次打开聊天 tab 时导入
+            from assistant.client import DEFAULT_BASE_URL, DEFAULT_MODEL, LLMClient, RequestMetrics
+
+            # 客户端 (及其 HTTP 连接池) 每个进程只创建一次，不再随每次 rerun 重建。
+            # ARK_BASE_URL / ARK_MODEL 可在 secrets 中覆盖，例如指向本地的 OpenAI 兼容 stub server
+            @st.cache_resource
+            def get_llm_client(api_key, base_url, model):
+                """Pooled LLM client (timeouts + retries + latency metrics) shared by every session."""
+                return LLMClient(api_key, base_url=base_url, model=model)
+
+
+            client = get_llm_client(my_api_key, st.secrets.get("ARK_BASE_URL", DEFAULT_BASE_URL),
+                                    st.secrets.get("ARK_MODEL", DEFAULT_MODEL))
+
+
+            @st.cache_resource
+            def load_resume_index():
+                """Split the resume into sections and build the BM25 index once per process."""
+                sections = split_sections(RESUME_CONTENT)
+                if INDEX_RESUME_PDF:
+                    sections += load_pdf_sections("materials/resume.pdf")
+                return BM25Index(sections)
+
+
+            @st.cache_resource
+            def get_answer_cache():
+                """Answer cache shared by every session of this process."""
+                return AnswerCache()
+
+
+            resume_index = load_resume_index()
+            answer_cache = get_answer_cache()
+
+            # 聊天区是一个 fragment：发送消息只重跑这一段，不会重建其它 tab 和侧边栏
+            @st.fragment
+            def chat_panel():
+                # ---------------------------------------------------------------------
+                # 2. 初始化聊天历史
+                # ---------------------------------------------------------------------
+                if "messages" not in st.session_state:
+                    st.session_state.messages = []
+                    # 开场白
+                    welcome_msg = "Hello! I am Shuyue's AI Assistant. Ask me anything about her experience, Project details, or Education!"
+                    st.session_state.messages.append({"role": "assistant", "content": welcome_msg})
+
+                # ---------------------------------------------------------------------
+                # 3. 显示历史消息
+                # ---------------------------------------------------------------------
+                for msg in st.session_state.messages:
+                    st.chat_message(msg["role"]).write(msg["content"])
+
+                # ---------------------------------------------------------------------
+                # 4. 处理用户输入
+                # ---------------------------------------------------------------------
+                if prompt := st.chat_input("Ask about my experience (e.g., 'Tell me about the RED experience')"):
+
+                    # 4.1 显示用户提问
+                    st.session_state.messages.append({"role": "user", "content": prompt})
+                    st.chat_message("user").write(prompt)
+
+                    # 4.2 构造发送给 AI 的消息列表 (System Prompt + 摘要 + 最近几轮)
+                    # 超出 token 预算的早期对话折叠成滚动摘要，摘要缓存在 session_state 中
+                    def summarize_with_llm(previous_summary, folded_messages):
+                        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in folded_messages)
+                        try:
+                            summary = client.complete(
+                                messages=[
+                                    {"role": "system",
+                                     "content": "Update the running summary of a recruiter's chat with Shuyue's resume assistant. "
+                                                "Keep facts that were asked about and answered. Reply with the summary only, under 150 words."},
+                                    {"role": "user",
+                                     "content": f"Current summary:\n{previous_summary or '(empty)'}\n\nNew turns:\n{transcript}"},
+                                ],
+                                max_tokens=300,
+                            )
+                            return summary.strip()
+                        except Exception:
+                            return extractive_summary(previous_summary, folded_messages)
+
+
+                    # 只检索与最近提问相关的简历段落 (带上上一个问题，方便追问)
+                    recent_questions = [m["content"] for m in st.session_state.messages if m["role"] == "user"][-2:]
+                    resume_context = format_sections(resume_index.search(" ".join(recent_questions), k=RETRIEVAL_TOP_K))
+                    system_prompt = f"You are a helpful assistant representing Shuyue Hou. Answer questions based strictly on this resume context:\n\n{resume_context}\n\nIf the answer is not in the resume, say you don't know but offer to contact Shuyue directly."
+
+                    # 4.3 先查问答缓存；命中则直接回放，未命中再调用豆包 API
+                    # 追问的答案依赖本会话的历史，只有会话中的第一个问题才读写共享缓存
+                    standalone = sum(m["role"] == "user" for m in st.session_state.messages) == 1
+                    cached_answer = answer_cache.get(prompt, resume_context) if standalone else None
+                    try:
+                        with st.chat_message("assistant"):
+                            if cached_answer is not None:
+                                response = st.write_stream(replay(cached_answer))
+                            else:
+                                chat_context = ChatContext(token_budget=CHAT_TOKEN_BUDGET, summarize=summarize_with_llm)
+                                api_messages = chat_context.build(system_prompt, st.session_state.messages, st.session_state)
+                                # 流式输出 (首 token 之前的瞬时错误会自动退避重试)
+                                metrics = RequestMetrics()
+                                response = st.write_stream(client.stream(api_messages, metrics=metrics))
+                                if standalone:
+                                    answer_cache.put(prompt, resume_context, response)
+                                st.session_state.last_llm_metrics = metrics.as_dict()
+
+                        # 4.4 保存 AI 回复到历史
+                        st.session_state.messages.append({"role": "assistant", "content": response})
+
+                    except Exception as e:
+                        st.error(f"Error connecting to AI: {e}")
+
+                cache_stats = answer_cache.stats()
+                st.caption(f"⚡ Answer cache: {cache_stats['hits']} hits / {cache_stats['lookups']} lookups "
+                           f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['size']} cached answers)")
+                last_metrics = st.session_state.get("last_llm_metrics")
+                if last_metrics and last_metrics["time_to_first_token"] is not None:
+                    speed = last_metrics["tokens_per_second"]
+                    st.caption(f"⏱️ Last answer: first token {last_metrics['time_to_first_token']:.2f}s, "
+                               f"total {last_metrics['total_latency']:.2f}s"
+                               + (f", {speed:.0f} tokens/s" if speed else "")
+                               + (f" ({last_metrics['attempts'] - 1} retries)" if last_metrics["attempts"] > 1 else ""))
+
+
+            chat_panel()
 
-    # 经历 1: Pingan Bank
-    with st.container():
-        st.subheader("Machine Learning Engineer | Pingan Bank Co.,Ltd.")
-        st.caption("Aug 2025 - Present (Full Time) | Shenzhen")
 
+# =============================================================================
+# TAB 3: 多维比率归因引擎 (Rate/Mix + Beam Search)
+# =============================================================================
+if tab3.open:
+    with tab3:
+        st.header("📉 Metric Attribution Engine")
         st.markdown("""
-        *   **Business Driver & Root Cause Analysis:** Developed a Rate/Mix decomposition engine to **quantify drivers** behind CTR/CVR fluctuations for **￥10B+ campaigns**. Reduced anomaly diagnosis time from days to hours.
-        *   **GenAI-powered Dashboard:** Designed an **LLM-Agent dashboard** that auto-generates diagnostic reports, slashing reporting time by **98%**. 
-        *   **Data Pipeline (ETL):** Engineered a robust **Source-ETL-Model pipeline** (SQL & Python) to resolve T0/T1 data alignment, ensuring **100% data integrity** for attribution models.
+        This module simulates the **Root Cause Analysis System** I developed using Python.
+        Unlike traditional dashboards, it uses a **Beam Search Algorithm** to automatically traverse high-dimensional data 
+        and decompose Ratio Metrics (e.g., CTR, CVR) into **Rate Effect** (Efficiency) vs. **Mix Effect** (Structure).
         """)
-        st.success("💡 **Impact:** Solved the 'Business-Technology Challenge' by automating manual diagnostics with GenAI.")
 
-    # 经历 2: Xiaohongshu
-    with st.container():
-        st.subheader("Data Analyst | Xiaohongshu (RED)")
-        st.caption("Dec 2023 - May 2024 (Intern) | Beijing")
 
-        st.markdown("""
-        *   **Strategic Bidding (SQL):** Analyzed **300,000+ user search behaviors using SQL**. Identified long-tail keywords to optimize budget allocation.
-        *   **Business Impact:** Drove a **25% increase in ROAS** and 18% growth in sales volume by capturing niche user intent.
-        *   **Dashboarding:** Developed automated **Power BI dashboards** to visualize real-time metrics (CTR, CVR, CPA), reducing reporting time by 50%.
+        # -------------------------------------------------------------------------
+        # 1. 核心算法逻辑
+        # -------------------------------------------------------------------------
+        # calculate_ratio_contribution_v2 及向量化的 Rate/Mix 引擎见 attribution/engine.py：
+        # 每个节点的 Weight / Ratio / Rate Effect / Mix Effect 由一次 group-by + 数组运算得到。
+
+        st.divider()
+
+        # -------------------------------------------------------------------------
+        # 2. 模拟业务场景数据 (Simulation Data)
+        # -------------------------------------------------------------------------
+        # 场景：CTR 下降。
+        # 原因：虽然 Search (高CTR) 和 Feed (低CTR) 的各自 CTR 都没怎么跌，
+        # 但 Feed 的流量占比从 50% 涨到了 80%，导致大盘 CTR 被拉低 (典型的 Mix Effect)。
+        # 另外 v10.5 版本的 Search 流量 CTR 真的跌了 (Rate Effect)。
+        # 场景的唯一定义 (维度取值、流量占比、CTR 系数) 见 attribution/synthetic.py。
+
+
+        # 以下计算结果都按输入参数缓存 (st.cache_data / st.cache_resource)，rerun 时只重算真正变化的部分
+        @st.cache_data(show_spinner=False)
+        def build_demo_events(period):
+            """Leaf-level (clicks, impressions) table of one period for the demo scenario."""
+            # T0 (Base Period：基期，也就是参照的对比组)；T1 (Current Period：当期，曝光涨了)
+            return demo_events(period)
+
+
+        @st.cache_resource
+        def build_demo_cubes():
+            """Scan both periods once (dictionary-encoded, shared codes); every later drill-down is answered from the cubes."""
+            return AttributionCube.build_pair(build_demo_events("T0"), build_demo_events("T1"), list(DEMO_DIMENSIONS),
+                                              max_depth=len(DEMO_DIMENSIONS))
+
+
+        @st.cache_data(show_spinner=False)
+        def global_attribution():
+            """Global CTR of both periods and the Channel-level Rate/Mix split."""
+            events_t0 = build_demo_events("T0")
+            events_t1 = build_demo_events("T1")
+
+            clicks_t0, imp_t0 = events_t0["clicks"].sum(), events_t0["impressions"].sum()
+            ctr_t0 = clicks_t0 / imp_t0  # ~5.0%
+
+            # 模拟：CTR 掉到了 ~3.8%
+            clicks_t1, imp_t1 = events_t1["clicks"].sum(), events_t1["impressions"].sum()
+            ctr_t1 = clicks_t1 / imp_t1  # ~3.8%
+
+            # 第一层归因结果 (Global Level Decomposition)
+            # 汇总了 Channel 维度所有子节点的 Rate Effect 和 Mix Effect
+            channel_summary = summarize_effects(decompose_rate_mix(events_t0, events_t1, ["Channel"]))
+            return float(ctr_t0), float(ctr_t1), channel_summary["rate_effect"], channel_summary["mix_effect"]
+
+
+        cube_t0, cube_t1 = build_demo_cubes()
+
+        # 故事：Mix Effect (结构) 贡献了绝大部分跌幅 (~-1.0%)，Rate Effect (效率) 只跌了一点点 (~-0.2%)
+        ctr_t0, ctr_t1, total_rate_effect, total_mix_effect = global_attribution()
+        delta_ctr = ctr_t1 - ctr_t0  # ~-1.2%
+
+        # -------------------------------------------------------------------------
+        # 3. 核心指标看板 (KPIs)
+        # -------------------------------------------------------------------------
+        col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
+        col_kpi1.metric("Global CTR (Period T0)", f"{ctr_t0 * 100:.2f}%")
+        col_kpi2.metric("Global CTR (Period T1)", f"{ctr_t1 * 100:.2f}%", delta=f"{delta_ctr * 100:.2f}%",
+                        delta_color="inverse")
+        driver = "Mix" if abs(total_mix_effect) >= abs(total_rate_effect) else "Rate"
+        col_kpi3.metric("Attribution Status", f"⚠️ {driver}-Driven {'Drop' if delta_ctr < 0 else 'Rise'}")
+
+        # -------------------------------------------------------------------------
+        # 4. 第一层：Rate/Mix 瀑布图 (Waterfall)
+        # -------------------------------------------------------------------------
+        st.subheader("Global Attribution (Aggregated by Channel Dimension)")
+        st.caption("""
+           Did the CTR drop because ads performed worse (Rate), or because traffic shifted to low-CTR channels (Mix)?
         """)
-        st.success("💡 **Impact:** Demonstrated data-driven growth capability by translating user behavior insights into bidding strategies that significantly improved ROAS and revenue.")
-
-    st.divider()
-
-    # --- 创业经历 (Entrepreneurship) ---
-    st.header("🚀 Entrepreneurship Experience")
 
-    with st.container():
-        st.subheader("Co-founder | OfferLah (Startup)")
-        st.caption("Feb 2025 - Present | Singapore")
-
-        st.markdown("""
-        *   **Operational System Design & Automation:** Spearheaded the migration from **manual spreadsheets to an automated scheduling ecosystem**. Established a centralized data tracking system that **reduced admin overhead by 40%**.
-        *   **Funnel Analysis & User Growth:** Defined full-funnel conversion metrics. Identified a **15% drop-off** at the service inquiry stage using data visualization, prompting a UI/UX redesign that improved the **Lead-to-Customer conversion rate by 20%**.
+        @st.cache_resource(show_spinner=False)
+        def build_waterfall(ctr_t0, rate_effect, mix_effect, ctr_t1):
+            """Rate/Mix waterfall figure, built once per distinct set of values."""
+            import plotly.graph_objects as go
+
+            fig = go.Figure(go.Waterfall(
+                name="CTR Decomposition", orientation="v",
+                measure=["relative", "relative", "relative", "total"],
+                x=["CTR T0", "Rate Effect (Efficiency)", "Mix Effect (Structure)", "CTR T1"],
+                textposition="outside",
+                text=[f"{ctr_t0 * 100:.2f}%", f"{rate_effect * 100:.2f}%", f"{mix_effect * 100:.2f}%",
+                      f"{ctr_t1 * 100:.2f}%"],
+                y=[ctr_t0, rate_effect, mix_effect, ctr_t1],
+                connector={"line": {"color": "rgb(63, 63, 63)"}},
+                decreasing={"marker": {"color": "#FF4B4B"}},
+                increasing={"marker": {"color": "#2ECC71"}},
+                totals={"marker": {"color": "#1F77B4"}}
+            ))
+            fig.update_layout(title="Drivers of CTR Drop", height=400, yaxis_tickformat=".2%")
+            return fig
+
+
+        fig_waterfall = build_waterfall(ctr_t0, total_rate_effect, total_mix_effect, ctr_t1)
+        st.plotly_chart(fig_waterfall, use_container_width=True)
+
+        st.info(f"""
+        **🧠 Insight:** 
+        The waterfall reveals a **Structural Issue (Mix Effect)**. 
+        The negative impact comes primarily from **Mix Effect ({total_mix_effect * 100:.1f}%)**, meaning high-quality traffic volume decreased or low-quality traffic increased. 
+        Efficiency (Rate Effect, {total_rate_effect * 100:.1f}%) remained relatively stable.
         """)
-        st.success(
-            "💡 **Impact:** Demonstrated full-cycle ability from defining metrics -> identifying problems -> implementing solutions.")
-
-    st.divider()
-
-    # --- 第四部分：项目 (Projects) ---
-    st.header("📂 Key Projects")
-
-    col_p1, col_p2 = st.columns(2)
-
-    with col_p1:
-        st.markdown("**💰 Financial Transaction Risk Dashboard**")
-        st.markdown("*Tableau, LOD Expressions, Pareto Analysis*")
-        st.markdown(
-            "Identified **anomalies and high-risk transactions** using dynamic thresholding. Solved resource allocation challenges.")
-        st.markdown("[🔗 View Dashboard](https://public.tableau.com/app/profile/shuyue.hou)")
 
-    with col_p2:
-        st.markdown("**📝 Ensemble Text Classification System**")
-        st.markdown("*Python, Scikit-Learn, NLP, TF-IDF*")
-        st.markdown(
-            "Engineered a text processing pipeline and implemented **AHP (Analytic Hierarchy Process)** to improve precision/recall to over 85%.")
-        st.markdown("[🔗 View GitHub](https://github.com/sHellzip/question_pair)")
-
-# =============================================================================
-# TAB 2: AI Chat (Doubao / Volcengine Integration)
-# =============================================================================
-with tab2:
-    st.header("✨ Chat with My Resume")
-    st.caption("Powered by Doubao (Volcengine) LLM")
-
-    # -------------------------------------------------------------------------
-    # 1. 初始化 API Client
-    # -------------------------------------------------------------------------
-    # 为了演示方便，暂时直接在这里填 Key。
-    # 正式部署时建议使用 st.secrets["ARK_API_KEY"]
-    try:
-        my_api_key = st.secrets["ARK_API_KEY"]
-    except FileNotFoundError:
-        st.error("⚠️ API Key 未找到。请在本地配置 .streamlit/secrets.toml 或在云端配置 Secrets。")
-        st.stop()
-
-    if not my_api_key:
-        st.warning("⚠️ Please provide a valid API Key in the code to activate the chatbot.")
-    else:
-        client = OpenAI(
-            base_url="https://ark.cn-beijing.volces.com/api/v3",
-            api_key=my_api_key,
-        )
+        # -------------------------------------------------------------------------
+        # 5. 第二层：Beam Search 自动下钻结果 (Automated Drill-down)
+        # -------------------------------------------------------------------------
+        st.subheader("Automated Root Cause Discovery (Beam Search)")
+        st.markdown(f"""
+        The system executes a **Beam Search** algorithm (Top-K pruning) across dimensions: {", ".join(f"`{d}`" for d in DEMO_DIMENSIONS)}.
+        Here are the **Top Negative Contributors** identified automatically:
+        """)
 
-        # ---------------------------------------------------------------------
-        # 2. 初始化聊天历史
-        # ---------------------------------------------------------------------
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
-            # 开场白
-            welcome_msg = "Hello! I am Shuyue's AI Assistant. Ask me anything about her experience, Project details, or Education!"
-            st.session_state.messages.append({"role": "assistant", "content": welcome_msg})
-
-        # ---------------------------------------------------------------------
-        # 3. 显示历史消息
-        # ---------------------------------------------------------------------
-        for msg in st.session_state.messages:
-            st.chat_message(msg["role"]).write(msg["content"])
-
-        # ---------------------------------------------------------------------
-        # 4. 处理用户输入
-        # ---------------------------------------------------------------------
-        if prompt := st.chat_input("Ask about my experience (e.g., 'Tell me about the RED experience')"):
-
-            # 4.1 显示用户提问
-            st.session_state.messages.append({"role": "user", "content": prompt})
-            st.chat_message("user").write(prompt)
-
-            # 4.2 构造发送给 AI 的消息列表 (System Prompt + History)
-            api_messages = [
-                {"role": "system",
-                 "content": f"You are a helpful assistant representing Shuyue Hou. Answer questions based strictly on this resume context:\n\n{RESUME_CONTENT}\n\nIf the answer is not in the resume, say you don't know but offer to contact Shuyue directly."}
-            ]
-
-            # 追加历史对话 (为了让 AI 有记忆)
-            for m in st.session_state.messages:
-                api_messages.append({"role": m["role"], "content": m["content"]})
-
-            # 4.3 调用豆包 API
-            try:
-                with st.chat_message("assistant"):
-                    stream = client.chat.completions.create(
-                        model="doubao-seed-1-8-251228",  # 你的 Endpoint ID
-                        messages=api_messages,
-                        stream=True
+        # 参数控件、Beam Search 结果和路径下钻是一个 fragment：点击按钮 / 切换路径只重跑这一段
+        @st.fragment
+        def beam_search_panel():
+            col_bw, col_depth, col_support = st.columns(3)
+            beam_width = col_bw.slider("Beam width (K)", min_value=1, max_value=10, value=3)
+            max_depth = col_depth.slider("Max depth", min_value=1, max_value=len(DEMO_DIMENSIONS), value=2)
+            min_support = col_support.slider("Min. traffic share", min_value=0.0, max_value=0.5, value=0.05, step=0.01,
+                                             format="%.2f")
+            use_ci = st.checkbox("Bootstrap 95% confidence intervals (rank by the conservative bound)", value=False)
+
+
+            @st.cache_data(show_spinner=False)
+            def run_beam_search(beam_width, max_depth, min_support, use_ci):
+                """Beam search on the demo cubes, memoized per parameter combination."""
+                return beam_search(cube_t0, cube_t1, list(DEMO_DIMENSIONS),
+                                   beam_width=beam_width, max_depth=max_depth, min_support=min_support,
+                                   n_boot=1000 if use_ci else 0, rank_by="lower_bound" if use_ci else "point")
+
+
+            if st.button("🚀 Run Beam Search Algorithm"):
+                with st.spinner('Running multidimensional decomposition algorithm...'):
+                    st.session_state.beam_results = run_beam_search(beam_width, max_depth, min_support, use_ci)
+
+            # 结果保存在 session_state 中，后续下钻点击不会丢失
+            if "beam_results" in st.session_state:
+                beam_df = st.session_state.beam_results
+
+                def with_arrow(t0_value, t1_value, digits=1):
+                    """T1 value as a percentage, flagged when it moved by more than 10% relative to T0."""
+                    label = f"{t1_value * 100:.{digits}f}%"
+                    if t0_value and abs(t1_value / t0_value - 1) > 0.1:
+                        label += " (⬆)" if t1_value > t0_value else " (⬇)"
+                    return label
+
+
+                if beam_df.empty:
+                    st.warning("No negative contributor passed the minimum traffic share threshold.")
+                else:
+                    # 将 Beam Search 返回的 flat_negative 结果转换为 DataFrame 展示
+                    df_results = pd.DataFrame({
+                        "Path (Dimension Combination)": beam_df["path"],
+                        "CTR T0": [f"{v * 100:.1f}%" for v in beam_df["ratio_t0"]],
+                        "CTR T1": [with_arrow(a, b) for a, b in zip(beam_df["ratio_t0"], beam_df["ratio_t1"])],
+                        "Weight T0": [f"{v * 100:.0f}%" for v in beam_df["weight_t0"]],
+                        "Weight T1": [with_arrow(a, b, digits=0) for a, b in zip(beam_df["weight_t0"], beam_df["weight_t1"])],
+                        "Rate Effect": [f"{v * 100:.2f}%" for v in beam_df["rate_effect"]],
+                        "Mix Effect": [f"{v * 100:.2f}%" for v in beam_df["mix_effect"]],
+                        "Contribution": [f"{v * 100:.2f}%" for v in beam_df["contribution"]],
+                    })
+                    if "contribution_lo" in beam_df:
+                        df_results["Contribution 95% CI"] = [f"[{lo * 100:.2f}%, {hi * 100:.2f}%]" for lo, hi in
+                                                             zip(beam_df["contribution_lo"], beam_df["contribution_hi"])]
+
+                    # 高亮展示
+                    st.dataframe(
+                        df_results.style.map(lambda x: 'color: red' if 'Negative' in str(x) or '-' in str(x) else 'color: black'),
+                        use_container_width=True
                     )
-                    # 流式输出
-                    response = st.write_stream(stream)
-
-                # 4.4 保存 AI 回复到历史
-                st.session_state.messages.append({"role": "assistant", "content": response})
-
-            except Exception as e:
-                st.error(f"Error connecting to AI: {e}")
-
-
-# =============================================================================
-# TAB 3: 多维比率归因引擎 (Rate/Mix + Beam Search)
-# =============================================================================
-with tab3:
-    st.header("📉 Metric Attribution Engine")
-    st.markdown("""
-    This module simulates the **Root Cause Analysis System** I developed using Python.
-    Unlike traditional dashboards, it uses a **Beam Search Algorithm** to automatically traverse high-dimensional data 
-    and decompose Ratio Metrics (e.g., CTR, CVR) into **Rate Effect** (Efficiency) vs. **Mix Effect** (Structure).
-    """)
-
-
-    # -------------------------------------------------------------------------
-    # 1. 定义核心算法逻辑
-    # -------------------------------------------------------------------------
-    def calculate_ratio_contribution_v2(node_ratio_t0, node_ratio_t1, w_t0, w_t1):
-        """
-        Reflecting the exact logic from my project code:
-        Rate Effect = (Rate_t1 - Rate_t0) * W_t1
-        Mix Effect  = (W_t1 - W_t0) * Rate_t0
-        """
-        rate_effect = (node_ratio_t1 - node_ratio_t0) * w_t1
-        mix_effect = (w_t1 - w_t0) * node_ratio_t0
-        return rate_effect, mix_effect
 
+                    top = beam_df.iloc[0]
+                    top_driver = "Mix Effect" if abs(top["mix_effect"]) >= abs(top["rate_effect"]) else "Rate Effect"
+                    st.success(f"""
+                    **🎯 Root Cause Found:** 
+                    The primary driver is **'{top["path"]}'** ({top_driver}), contributing **{top["contribution"] * 100:.2f}%** to the CTR change. 
+                    Its CTR moved from {top["ratio_t0"] * 100:.1f}% to {top["ratio_t1"] * 100:.1f}%, while its traffic share moved from {top["weight_t0"] * 100:.0f}% to {top["weight_t1"] * 100:.0f}%.
+                    **Action:** {"Re-evaluate bid adjustment / traffic allocation for this segment." if top_driver == "Mix Effect" else "Investigate ad quality and user experience in this segment."}
+                    """)
+
+                # ---------------------------------------------------------------------
+                # 6. 路径下钻浏览 (Path Explorer, 直接查 Cube)
+                # ---------------------------------------------------------------------
+                st.markdown("##### 🔎 Drill into a path")
+                col_path, col_dim = st.columns(2)
+                path_options = {"(All traffic)": ()}
+                path_options.update({row.path: row.conditions for row in beam_df.itertuples()})
+                selected_path = col_path.selectbox("Path", list(path_options))
+                conditions = path_options[selected_path]
+                used_dims = {dim for dim, _ in conditions}
+                remaining_dims = [dim for dim in DEMO_DIMENSIONS if dim not in used_dims]
+
+                @st.cache_data(show_spinner=False)
+                def drill_down(conditions, breakdown_dim):
+                    """Rate/Mix split of the children of one path, memoized per (path, dimension)."""
+                    child_effects = decompose_aggregates(
+                        cube_t0.children(conditions, breakdown_dim), cube_t1.children(conditions, breakdown_dim),
+                        "clicks", "impressions",
+                        total_t0=tuple(cube_t0.totals), total_t1=tuple(cube_t1.totals),
+                    )
+                    child_effects.index = [format_path(conditions + ((breakdown_dim, value),))
+                                           for value in child_effects.index]
+                    return child_effects
+
+
+                if remaining_dims:
+                    breakdown_dim = col_dim.selectbox("Break down by", remaining_dims)
+                    child_effects = drill_down(conditions, breakdown_dim)
+                    st.dataframe(
+                        child_effects[["ratio_t0", "ratio_t1", "weight_t0", "weight_t1",
+                                       "rate_effect", "mix_effect", "contribution"]].style.format("{:.2%}"),
+                        use_container_width=True
+                    )
+                else:
+                    st.caption("This path already uses every dimension.")
 
-    st.divider()
-
-    # -------------------------------------------------------------------------
-    # 2. 模拟业务场景数据 (Simulation Data)
-    # -------------------------------------------------------------------------
-    # 场景：CTR 下降。
-    # 原因：虽然 Search (高CTR) 和 Feed (低CTR) 的各自 CTR 都没怎么跌，
-    # 但 Feed 的流量占比从 50% 涨到了 80%，导致大盘 CTR 被拉低 (典型的 Mix Effect)。
-
-    # T0 (Base Period：基期，也就是参照的对比组)
-    clicks_t0 = 5000
-    imp_t0 = 100000
-    ctr_t0 = clicks_t0 / imp_t0  # 5.0%
-
-    # T1 (Current Period：当期，顾名思义，就是现在这个时期)
-    # 模拟：CTR 掉到了 3.8%
-    clicks_t1 = 4560
-    imp_t1 = 120000  # 曝光涨了
-    ctr_t1 = clicks_t1 / imp_t1  # 3.8%
-
-    delta_ctr = ctr_t1 - ctr_t0  # -1.2%
-
-    # 模拟第一层归因结果 (Global Level Decomposition)
-    # 汇总了所有子节点的 Rate Effect 和 Mix Effect
-
-
-    # 故事：Mix Effect (结构) 贡献了绝大部分跌幅 (-1.0%)，Rate Effect (效率) 只跌了一点点 (-0.2%)
-    total_rate_effect = -0.002
-    total_mix_effect = -0.010
-
-    # -------------------------------------------------------------------------
-    # 3. 核心指标看板 (KPIs)
-    # -------------------------------------------------------------------------
-    col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
-    col_kpi1.metric("Global CTR (Period T0)", f"{ctr_t0 * 100:.2f}%")
-    col_kpi2.metric("Global CTR (Period T1)", f"{ctr_t1 * 100:.2f}%", delta=f"{delta_ctr * 100:.2f}%",
-                    delta_color="inverse")
-    col_kpi3.metric("Attribution Status", "⚠️ Mix-Driven Drop")
-
-    # -------------------------------------------------------------------------
-    # 4. 第一层：Rate/Mix 瀑布图 (Waterfall)
-    # -------------------------------------------------------------------------
-    st.subheader("Global Attribution (Aggregated by Channel Dimension)")
-    st.caption("""
-       Did the CTR drop because ads performed worse (Rate), or because traffic shifted to low-CTR channels (Mix)?
-    """)
-
-    fig_waterfall = go.Figure(go.Waterfall(
-        name="CTR Decomposition", orientation="v",
-        measure=["relative", "relative", "relative", "total"],
-        x=["CTR T0", "Rate Effect (Efficiency)", "Mix Effect (Structure)", "CTR T1"],
-        textposition="outside",
-        text=[f"{ctr_t0 * 100:.2f}%", f"{total_rate_effect * 100:.2f}%", f"{total_mix_effect * 100:.2f}%",
-              f"{ctr_t1 * 100:.2f}%"],
-        y=[ctr_t0, total_rate_effect, total_mix_effect, ctr_t1],
-        connector={"line": {"color": "rgb(63, 63, 63)"}},
-        decreasing={"marker": {"color": "#FF4B4B"}},
-        increasing={"marker": {"color": "#2ECC71"}},
-        totals={"marker": {"color": "#1F77B4"}}
-    ))
-    fig_waterfall.update_layout(title="Drivers of CTR Drop", height=400, yaxis_tickformat=".2%")
-    st.plotly_chart(fig_waterfall, use_container_width=True)
-
-    st.info("""
-    **🧠 Insight:** 
-    The waterfall reveals a **Structural Issue (Mix Effect)**. 
-    The negative impact comes primarily from **Mix Effect (-1.0%)**, meaning high-quality traffic volume decreased or low-quality traffic increased. 
-    Efficiency (Rate Effect) remained relatively stable.
-    """)
-
-    # -------------------------------------------------------------------------
-    # 5. 第二层：Beam Search 自动下钻结果 (Automated Drill-down)
-    # -------------------------------------------------------------------------
-    st.subheader("Automated Root Cause Discovery (Beam Search)")
-    st.markdown("""
-    The system executed a **Beam Search** algorithm (Top-K pruning) across dimensions: `Channel`, `App_Version`, `User_Tag`.
-    Here are the **Top Negative Contributors** identified automatically:
-    """)
-
-    if st.button("🚀 Run Beam Search Algorithm"):
-        import time
-
-        # 模拟计算
-        with st.spinner('Running multidimensional decomposition algorithm...'):
-            time.sleep(1.5)
-
-        # 模拟 Beam Search 返回的 flat_negative 结果列表
-        beam_results = [
-            {
-                "Path (Dimension Combination)": "Channel=Feed_Flow",
-                "CTR T0": "2.5%",
-                "CTR T1": "2.4%",
-                "Weight T0": "50%",
-                "Weight T1": "80% (⬆)",  # 流量占比暴涨，拉低了大盘
-                "Contribution": "-0.85%"
-            },
-            {
-                "Path (Dimension Combination)": "Region=Tier3_Cities",
-                "CTR T0": "3.0%",
-                "CTR T1": "2.9%",
-                "Weight T0": "20%",
-                "Weight T1": "35% (⬆)",
-                "Contribution": "-0.15%"
-            },
-            {
-                "Path (Dimension Combination)": "App_Version=v10.5 -> Channel=Search",
-                "CTR T0": "12.0%",
-                "CTR T1": "10.5% (⬇)",  # 真的跌了
-                "Weight T0": "10%",
-                "Weight T1": "10%",
-                "Contribution": "-0.12%"
-            }
-        ]
-
-        # 将结果转换为 DataFrame 展示
-        df_results = pd.DataFrame(beam_results)
-
-        # 高亮展示
-        st.dataframe(
-            df_results.style.map(lambda x: 'color: red' if 'Negative' in str(x) or '-' in str(x) else 'color: black'),
-            use_container_width=True
-        )
 
-        st.success("""
-        **🎯 Root Cause Found:** 
-        The primary driver is the significant **traffic shift towards 'Feed_Flow'** (Mix Effect). 
-        While 'Feed_Flow' CTR is stable, its volume share increased from 50% to 80%, diluting the overall performance.
-        **Action:** Re-evaluate bid adjustment for Feed Flow traffic.
-        """)
\ No newline at end of file
+        beam_search_panel()
@@ -0,0 +1,37 @@
+"""
+Helpers behind the "Chat with My Resume" tab (prompt context, retrieval,
+caching, LLM client), kept out of ``app.py`` so they can be used without
+Streamlit.
+"""
+from assistant.cache import AnswerCache, normalize_question, replay
+from assistant.context import ChatContext, estimate_tokens, extractive_summary
+from assistant.retrieval import BM25Index, format_sections, load_pdf_sections, split_sections
+
+# assistant.client imports the (slow to import) openai SDK, so it is only
+# loaded on first access of one of its names.
+_CLIENT_NAMES = {"DEFAULT_BASE_URL", "DEFAULT_MODEL", "LLMClient", "RequestMetrics"}
+
+
+def __getattr__(name):
+    if name in _CLIENT_NAMES:
+        from assistant import client
+        return getattr(client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = [
+    "DEFAULT_BASE_URL",
+    "DEFAULT_MODEL",
+    "AnswerCache",
+    "BM25Index",
+    "ChatContext",
+    "LLMClient",
+    "RequestMetrics",
+    "estimate_tokens",
+    "extractive_summary",
+    "format_sections",
+    "load_pdf_sections",
+    "normalize_question",
+    "replay",
+    "split_sections",
+]
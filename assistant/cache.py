@@ -0,0 +1,94 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# -----------------------------------------------------------------------------
+# 问答缓存 (Process-wide Answer Cache, LRU + TTL)
+# -----------------------------------------------------------------------------
+# 访客反复问同样几个问题；答案按 "规范化问题 + 简历上下文哈希" 缓存，所有会话共享。
+# 只缓存独立问题 (会话中的第一个提问)：追问的答案依赖该会话的历史，不能跨会话复用。
+# 命中时通过同一个 st.write_stream 路径回放，用户体验不变，但省掉一次 LLM 往返。
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 6 * 3600
+
+
+def normalize_question(question):
+    """Case-, whitespace- and punctuation-insensitive form of a question."""
+    question = question.lower().replace("’", "'").replace("‘", "'")
+    question = re.sub(r"[^\w\s']", " ", question)
+    return " ".join(question.split())
+
+
+def context_hash(context):
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()[:16]
+
+
+def replay(answer, words_per_chunk=3):
+    """Yield a cached answer in small chunks, like a streamed completion, for ``st.write_stream``."""
+    words = re.findall(r"\S+\s*", answer)
+    for start in range(0, len(words), words_per_chunk):
+        yield "".join(words[start:start + words_per_chunk])
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache of chat answers with a time-to-live.
+
+    Entries are keyed on the normalized question plus a hash of the resume
+    context it was answered from, so a changed resume (or different
+    retrieved sections) never serves a stale answer. The key does not cover
+    the chat history, so callers should only use it for standalone
+    questions, not follow-ups.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def key(question, context):
+        return normalize_question(question), context_hash(context)
+
+    def get(self, question, context):
+        """Cached answer or ``None``; counts towards the hit-rate statistics."""
+        key = self.key(question, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._counts["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counts["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counts["hits"] += 1
+            return entry[1]
+
+    def put(self, question, context, answer):
+        if not answer:
+            return
+        key = self.key(question, context)
+        with self._lock:
+            self._entries[key] = (self._clock(), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["misses"]
+            return {**self._counts, "size": len(self._entries), "lookups": lookups,
+                    "hit_rate": self._counts["hits"] / lookups if lookups else 0.0}
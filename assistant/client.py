@@ -0,0 +1,175 @@
+import random
+import threading
+import time
+from collections import deque
+
+import openai
+from openai import OpenAI
+
+from assistant.context import estimate_tokens
+
+# -----------------------------------------------------------------------------
+# LLM Client (连接复用 + 超时 + 重试 + 流式延迟指标)
+# -----------------------------------------------------------------------------
+# OpenAI 客户端只创建一次并在所有会话间复用，HTTP keep-alive 连接池不再随每次 rerun 丢弃。
+# 首个 token 之前的瞬时错误 (连接失败 / 超时 / 429 / 5xx) 按指数退避重试；
+# 每个请求记录首 token 延迟 (TTFT)、生成速度 (tokens/s) 和总耗时。
+# base_url 可配置，因此可以指向本地的 OpenAI 兼容 stub server 做测试。
+
+DEFAULT_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
+DEFAULT_MODEL = "doubao-seed-1-8-251228"
+
+_RETRYABLE_STATUS = {408, 409, 429}
+
+
+def is_transient(error):
+    """Errors worth retrying: connection problems, timeouts, rate limits and server errors."""
+    if isinstance(error, openai.APIConnectionError):  # 包括 APITimeoutError
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+class RequestMetrics:
+    """Latency figures of one chat completion request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.attempts = 0
+        self.time_to_first_token = None
+        self.total_latency = None
+        self.completion_tokens = 0
+        self.error = None
+
+    @property
+    def tokens_per_second(self):
+        if self.total_latency is None or self.time_to_first_token is None:
+            return None
+        generation = self.total_latency - self.time_to_first_token
+        return self.completion_tokens / generation if generation > 0 else None
+
+    def as_dict(self):
+        return {
+            "attempts": self.attempts,
+            "time_to_first_token": self.time_to_first_token,
+            "total_latency": self.total_latency,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "error": self.error,
+        }
+
+
+class LLMClient:
+    """
+    One pooled, reusable OpenAI-compatible client with timeouts, retries and metrics.
+
+    Create it once per process (e.g. with ``st.cache_resource``). ``stream``
+    yields plain text chunks, so its result can go straight into
+    ``st.write_stream``; ``complete`` is the non-streaming counterpart.
+    Metrics of the last ``history`` requests are kept for :meth:`stats`.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, model=DEFAULT_MODEL,
+                 connect_timeout=5.0, read_timeout=60.0, max_retries=3, backoff=0.5, max_backoff=8.0,
+                 history=200):
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # 重试由本类自己控制 (只在首个 token 之前重试)，关闭 SDK 内置重试
+        self.client = OpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            timeout=openai.Timeout(read_timeout, connect=connect_timeout),
+            max_retries=0,
+        )
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def _sleep_before_retry(self, attempt):
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        time.sleep(delay * (0.5 + random.random() / 2))
+
+    def _create(self, metrics, **kwargs):
+        """``chat.completions.create`` with exponential backoff on transient errors."""
+        model = kwargs.pop("model", self.model)
+        for attempt in range(self.max_retries + 1):
+            metrics.attempts = attempt + 1
+            try:
+                return self.client.chat.completions.create(model=model, **kwargs)
+            except openai.OpenAIError as error:
+                if attempt == self.max_retries or not is_transient(error):
+                    raise
+                self._sleep_before_retry(attempt)
+
+    def _record(self, metrics):
+        metrics.total_latency = time.perf_counter() - metrics.started
+        with self._lock:
+            self._history.append(metrics)
+
+    def stream(self, messages, metrics=None, **kwargs):
+        """
+        Stream the answer to ``messages`` as text chunks.
+
+        Pass a :class:`RequestMetrics` to read the figures of this request
+        once the generator is exhausted.
+        """
+        metrics = metrics if metrics is not None else RequestMetrics()
+        usage_tokens = None
+        chunks = []
+        try:
+            stream = self._create(metrics, messages=messages, stream=True, **kwargs)
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage_tokens = chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if not text:
+                    continue
+                if metrics.time_to_first_token is None:
+                    metrics.time_to_first_token = time.perf_counter() - metrics.started
+                chunks.append(text)
+                yield text
+        except Exception as error:
+            metrics.error = repr(error)
+            raise
+        finally:
+            metrics.completion_tokens = usage_tokens if usage_tokens is not None \
+                else estimate_tokens("".join(chunks))
+            self._record(metrics)
+
+    def complete(self, messages, metrics=None, **kwargs):
+        """Non-streaming completion text (used for short side calls such as summaries)."""
+        metrics = metrics if metrics is not None else RequestMetrics()
+        try:
+            completion = self._create(metrics, messages=messages, **kwargs)
+        except Exception as error:
+            metrics.error = repr(error)
+            self._record(metrics)
+            raise
+        metrics.time_to_first_token = time.perf_counter() - metrics.started
+        text = completion.choices[0].message.content or ""
+        usage = getattr(completion, "usage", None)
+        metrics.completion_tokens = usage.completion_tokens if usage is not None else estimate_tokens(text)
+        self._record(metrics)
+        return text
+
+    def stats(self):
+        """Median TTFT / latency / tokens-per-second and error count over the recent requests."""
+        with self._lock:
+            history = list(self._history)
+
+        def median(values):
+            values = sorted(v for v in values if v is not None)
+            return values[len(values) // 2] if values else None
+
+        return {
+            "requests": len(history),
+            "errors": sum(m.error is not None for m in history),
+            "retries": sum(max(m.attempts - 1, 0) for m in history),
+            "median_time_to_first_token": median(m.time_to_first_token for m in history),
+            "median_total_latency": median(m.total_latency for m in history),
+            "median_tokens_per_second": median(m.tokens_per_second for m in history),
+        }
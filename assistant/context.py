@@ -0,0 +1,142 @@
+import re
+
+# -----------------------------------------------------------------------------
+# 对话上下文预算 (Token-budgeted Chat History)
+# -----------------------------------------------------------------------------
+# 最近的若干轮原样保留；超出预算的更早轮次折叠进一段滚动摘要 (running summary)。
+# 摘要和"已折叠到第几条消息"缓存在 session_state 里，只有新折叠的消息才会触发重新摘要。
+
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_SUMMARY_TOKENS = 300
+
+_SUMMARY_HEADER = "\n\nSummary of the earlier conversation:\n"
+
+_CJK = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯＀-￯]")
+
+
+def estimate_tokens(text):
+    """Cheap token estimate: ~1 token per CJK character, ~4 characters per token otherwise."""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def message_tokens(message):
+    # 每条消息额外约 4 个 token 的角色/格式开销
+    return estimate_tokens(message["content"]) + 4
+
+
+def _trim_to_tokens(text, max_tokens, keep="end"):
+    """Cut ``text`` to roughly ``max_tokens`` from the start or (default) the end."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    ordered = reversed(lines) if keep == "end" else iter(lines)
+    kept, used = [], 0
+    for line in ordered:
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept:
+        # 连一整行都放不下：按字符截断这一行，而不是返回空串
+        line = lines[-1] if keep == "end" else lines[0]
+        return _trim_chars(line, max_tokens, keep)
+    return "\n".join(reversed(kept) if keep == "end" else kept)
+
+
+def _trim_chars(text, max_tokens, keep):
+    """Longest prefix (``keep="start"``) or suffix of ``text`` within ``max_tokens``."""
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        part = text[:mid] if keep == "start" else text[len(text) - mid:]
+        if estimate_tokens(part) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low] if keep == "start" else text[len(text) - low:]
+
+
+def extractive_summary(previous, messages, max_tokens=DEFAULT_SUMMARY_TOKENS):
+    """
+    Fold ``messages`` into ``previous`` without calling a model.
+
+    Each folded turn becomes one ``role: first sentence`` line; the oldest
+    lines are dropped once the summary exceeds ``max_tokens``.
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        first = re.split(r"(?<=[.!?。！？])\s", message["content"].strip(), maxsplit=1)[0]
+        lines.append(f"- {message['role']}: {_trim_to_tokens(first, 60, keep='start')}")
+    return _trim_to_tokens("\n".join(lines), max_tokens)
+
+
+class ChatContext:
+    """
+    Build the message list for one chat turn within ``token_budget`` tokens.
+
+    ``summarize(previous_summary, messages) -> str`` folds turns that no
+    longer fit; it defaults to :func:`extractive_summary`. The summary and
+    the number of folded messages live in ``state`` (e.g.
+    ``st.session_state``) under ``state_key``, so each turn only folds the
+    messages that newly fell out of the window. When turns are folded,
+    ``summary_tokens`` are reserved for the new summary; if ``summarize``
+    returns something longer, more turns are folded until the prompt fits.
+    """
+
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET, summarize=None, state_key="chat_summary",
+                 summary_tokens=DEFAULT_SUMMARY_TOKENS):
+        self.token_budget = token_budget
+        self.summarize = summarize or extractive_summary
+        self.summary_tokens = summary_tokens
+        self.state_key = state_key
+
+    def _state(self, state):
+        if self.state_key not in state:
+            state[self.state_key] = {"text": "", "folded": 0}
+        return state[self.state_key]
+
+    def _window_start(self, messages, folded, available):
+        """Index of the oldest unfolded message that still fits in ``available`` tokens."""
+        # 从最新一条往回数，直到用完预算 (至少保留最新一条)
+        start = len(messages)
+        used = 0
+        while start > folded:
+            cost = message_tokens(messages[start - 1])
+            if start < len(messages) and used + cost > available:
+                break
+            used += cost
+            start -= 1
+        return start
+
+    def build(self, system_prompt, messages, state):
+        """``[system, *recent messages]`` with older turns folded into the cached summary."""
+        summary = self._state(state)
+        folded = min(summary["folded"], len(messages))
+        available = self.token_budget - estimate_tokens(system_prompt)
+
+        def summary_cost(text):
+            return estimate_tokens(_SUMMARY_HEADER + text) if text else 0
+
+        start = self._window_start(messages, folded, available - summary_cost(summary["text"]))
+        if start > folded:
+            # 折叠后摘要会变长：按摘要上限预留空间，重新取窗口
+            reserve = max(summary_cost(summary["text"]), estimate_tokens(_SUMMARY_HEADER) + self.summary_tokens)
+            start = self._window_start(messages, folded, available - reserve)
+        while start > folded:
+            summary["text"] = self.summarize(summary["text"], messages[folded:start])
+            summary["folded"] = folded = start
+            # 自定义摘要函数可能超出预留，超出时继续折叠
+            start = self._window_start(messages, folded, available - summary_cost(summary["text"]))
+
+        system = system_prompt
+        if summary["text"]:
+            system += _SUMMARY_HEADER + summary["text"]
+        recent = [{"role": m["role"], "content": m["content"]} for m in messages[folded:]]
+        return [{"role": "system", "content": system}] + recent
+
+    def reset(self, state):
+        state.pop(self.state_key, None)
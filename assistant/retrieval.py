@@ -0,0 +1,119 @@
+import math
+import re
+from collections import Counter
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # 可选依赖：没有 pypdf 时只索引 RESUME_CONTENT
+    PdfReader = None
+
+# -----------------------------------------------------------------------------
+# 简历检索索引 (BM25 over Resume Sections)
+# -----------------------------------------------------------------------------
+# 简历按 [Education] / [Experience] / [Projects] ... 切成段落，启动时建一次 BM25 索引。
+# 每个问题只把最相关的几个段落放进 System Prompt，而不是整份简历。
+
+_TOKEN = re.compile(r"[a-z0-9]+|[一-鿿]")
+_HEADER = re.compile(r"^\[(?P<title>[^\]]+)\]\s*$", re.MULTILINE)
+_STOPWORDS = frozenset("a an and are about as at be by did do does for from had has have her his how i in is it "
+                       "me my of on or she tell that the their this to was what when where which who why with you "
+                       "your".split())
+
+
+def tokenize(text):
+    """Lower-case word tokens (CJK characters one by one), without stop words or plural ``s``."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def split_sections(text, preamble_title="Profile"):
+    """``[(title, body), ...]`` of a resume whose sections start with ``[Title]`` lines."""
+    sections = []
+    matches = list(_HEADER.finditer(text))
+    preamble = text[:matches[0].start()] if matches else text
+    if preamble.strip():
+        sections.append((preamble_title, preamble.strip()))
+    for match, following in zip(matches, matches[1:] + [None]):
+        body = text[match.end():following.start() if following else len(text)].strip()
+        if body:
+            sections.append((match.group("title"), body))
+    return sections
+
+
+def load_pdf_sections(path, title="Resume PDF", max_chars=1200):
+    """Text of a PDF split into ~``max_chars`` chunks; empty if ``pypdf`` is not installed or the file is missing."""
+    if PdfReader is None:
+        return []
+    try:
+        reader = PdfReader(path)
+    except (FileNotFoundError, OSError):
+        return []
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    chunks, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        if current and len(current) + len(paragraph) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}".strip()
+    if current:
+        chunks.append(current)
+    return [(f"{title} ({i + 1}/{len(chunks)})", chunk) for i, chunk in enumerate(chunks)]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a handful of ``(title, body)`` sections.
+
+    Titles are indexed with the body (twice, as a light boost), so questions
+    like "What's your education?" land on the matching section.
+    ``pinned`` titles (e.g. the profile header) are always returned.
+    """
+
+    def __init__(self, sections, pinned=("Profile",), k1=1.5, b=0.75):
+        self.sections = list(sections)
+        self.pinned = set(pinned)
+        self.k1, self.b = k1, b
+        self._docs = [Counter(tokenize(f"{title} {title} {body}")) for title, body in self.sections]
+        self._lengths = [sum(doc.values()) for doc in self._docs]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        n_docs = len(self._docs)
+        document_frequency = Counter(term for doc in self._docs for term in doc)
+        self._idf = {term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+
+    def scores(self, query):
+        terms = tokenize(query)
+        scores = []
+        for doc, length in zip(self._docs, self._lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self._avg_length) if self._avg_length else self.k1
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def search(self, query, k=2):
+        """
+        Pinned sections plus the ``k`` best-matching ones, in resume order.
+
+        When nothing matches (e.g. "Tell me about yourself") every section is
+        returned, i.e. the prompt falls back to the full resume.
+        """
+        scores = self.scores(query)
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+        if not ranked:
+            return list(self.sections)
+        chosen = set(ranked[:k]) | {i for i, (title, _) in enumerate(self.sections) if title in self.pinned}
+        return [self.sections[i] for i in sorted(chosen)]
+
+
+def format_sections(sections):
+    """Render sections back into the ``[Title]`` layout of ``RESUME_CONTENT``."""
+    return "\n\n".join(body if title == "Profile" else f"[{title}]\n{body}" for title, body in sections)
@@ -0,0 +1,67 @@
+"""
+Multi-dimensional ratio metric attribution (Rate/Mix decomposition).
+
+Kept free of Streamlit so the engine can be imported, benchmarked and
+profiled on its own; ``app.py`` only renders its results.
+"""
+from attribution.beam import beam_search, format_path
+from attribution.bootstrap import CI_COLUMNS, add_confidence_intervals, bootstrap_effects
+from attribution.cube import AttributionCube, align_cubes
+from attribution.encoding import ColumnStore, Cuboid, align_stores, code_dtype
+from attribution.engine import (
+    DEFAULT_METRICS,
+    EFFECT_COLUMNS,
+    aggregate_period,
+    calculate_ratio_contribution_v2,
+    decompose_aggregates,
+    decompose_arrays,
+    decompose_metrics,
+    decompose_rate_mix,
+    summarize_effects,
+)
+from attribution.incremental import IncrementalAttribution
+from attribution.ingest import ingest_period, iter_batches
+from attribution.parallel import ParallelExpander
+from attribution.periods import attribute_periods
+from attribution.synthetic import (DEMO_DIMENSIONS, demo_events, generate_period, iter_synthetic_batches,
+                                  synthetic_dimensions, write_period)
+from attribution.timing import STAGES, StageTimer, add_timing_hook, remove_timing_hook, timed
+
+__all__ = [
+    "CI_COLUMNS",
+    "AttributionCube",
+    "ColumnStore",
+    "Cuboid",
+    "DEFAULT_METRICS",
+    "DEMO_DIMENSIONS",
+    "IncrementalAttribution",
+    "ParallelExpander",
+    "STAGES",
+    "StageTimer",
+    "EFFECT_COLUMNS",
+    "add_confidence_intervals",
+    "add_timing_hook",
+    "aggregate_period",
+    "align_cubes",
+    "align_stores",
+    "attribute_periods",
+    "beam_search",
+    "bootstrap_effects",
+    "calculate_ratio_contribution_v2",
+    "code_dtype",
+    "decompose_aggregates",
+    "decompose_arrays",
+    "decompose_metrics",
+    "decompose_rate_mix",
+    "demo_events",
+    "format_path",
+    "generate_period",
+    "ingest_period",
+    "iter_batches",
+    "iter_synthetic_batches",
+    "remove_timing_hook",
+    "summarize_effects",
+    "synthetic_dimensions",
+    "timed",
+    "write_period",
+]
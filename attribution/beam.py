@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+from attribution.bootstrap import CI_COLUMNS, bootstrap_effects, score_lower_bound
+from attribution.cube import AttributionCube, align_cubes
+from attribution.engine import EFFECT_COLUMNS, decompose_aggregates
+from attribution.parallel import ParallelExpander
+from attribution.timing import timed_stage
+
+# -----------------------------------------------------------------------------
+# Beam Search 自动下钻 (Top-K Root Cause Drill-down)
+# -----------------------------------------------------------------------------
+# 穷举所有维度组合会组合爆炸 (6~10 个维度 × 高基数)。
+# 每一层只保留得分最高的 K 条路径 (beam)，下一层只在这 K 个节点下继续展开。
+
+DIRECTIONS = ("negative", "positive", "absolute")
+RANKINGS = ("point", "lower_bound")
+
+
+def format_path(conditions):
+    """``(("App_Version", "v10.5"), ("Channel", "Search"))`` -> ``App_Version=v10.5 -> Channel=Search``."""
+    return " -> ".join(f"{dim}={value}" for dim, value in conditions)
+
+
+def _score(contribution, direction):
+    """Higher is better; candidates with a non-positive score are pruned."""
+    if direction == "negative":
+        return -contribution
+    if direction == "positive":
+        return contribution
+    return np.abs(contribution)
+
+
+def _expand_serial(cube_t0, cube_t1, tasks):
+    """Children of every ``(conditions, dim)`` task, answered by cube lookups (no row scan)."""
+    return [(cube_t0.children_codes(conditions, dim), cube_t1.children_codes(conditions, dim))
+            for conditions, dim in tasks]
+
+
+def _as_cubes(data_t0, data_t1, dims, numerator, denominator):
+    if isinstance(data_t0, AttributionCube) and isinstance(data_t1, AttributionCube):
+        return align_cubes(data_t0, data_t1)
+    # 只建 base cuboid；beam 实际访问到的 cuboid 才按需 roll-up (而不是物化全部 C(n, ≤max_depth) 个)
+    return AttributionCube.build_pair(data_t0, data_t1, dims, (numerator, denominator))
+
+
+@timed_stage("beam_search")
+def beam_search(data_t0, data_t1, dims, numerator="clicks", denominator="impressions",
+                beam_width=3, max_depth=3, min_support=0.01, direction="negative", workers=None,
+                n_boot=0, alpha=0.05, rank_by="point", seed=0):
+    """
+    Top-K beam search over dimension combinations for the main drivers of a ratio change.
+
+    At each depth every frontier path is expanded along every dimension it
+    does not use yet. Children are scored by their Rate/Mix contribution to
+    the *global* ratio change, nodes whose traffic share (max of
+    ``weight_t0`` / ``weight_t1``) is below ``min_support`` are discarded,
+    and only the ``beam_width`` best paths survive to the next depth. Paths
+    reaching the same node in a different order are de-duplicated.
+
+    ``data_t0`` / ``data_t1`` are either raw event tables or prebuilt
+    :class:`AttributionCube` objects; passing cubes lets repeated searches
+    (different widths, depths, thresholds) skip the scan entirely. Cubes
+    built from event tables hold only the leaf cuboid, and only the
+    cuboids the beam actually visits are rolled up, so the cost follows
+    ``beam_width`` rather than the number of dimension combinations. A cube
+    built over several measures serves every metric formed from them, so
+    CTR / CVR / CPA drill-downs can share one pair of cubes.
+
+    ``direction`` selects what "best" means: ``"negative"`` (default) looks
+    for the drivers of a drop, ``"positive"`` for the drivers of a rise and
+    ``"absolute"`` for the largest movers either way.
+
+    ``workers`` > 1 rolls up the cuboids each depth needs but neither cube
+    has materialized yet on a reused process pool (see
+    :class:`ParallelExpander`); node lookups stay the same as in the serial
+    run, so the results are identical. The roll-ups are the bulk of a
+    search on lazy cubes (e.g. event tables); with fully materialized cubes
+    there is nothing to parallelize and the pool is not used.
+
+    ``n_boot`` > 0 attaches ``1 - alpha`` bootstrap intervals (``CI_COLUMNS``)
+    to every candidate; both measures must then be counts (see
+    :func:`bootstrap_effects`). With ``rank_by="lower_bound"`` candidates are ranked
+    and pruned by the pessimistic end of their interval, so small nodes that
+    only look large by chance fall out of the beam. ``seed`` makes the
+    resampling reproducible.
+
+    Returns a DataFrame with one row per kept path (``path``, ``depth``,
+    ``conditions`` and the ``EFFECT_COLUMNS``, plus ``CI_COLUMNS`` when
+    bootstrapping) sorted by score.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+    if rank_by not in RANKINGS:
+        raise ValueError(f"rank_by must be one of {RANKINGS}, got {rank_by!r}")
+    if rank_by == "lower_bound" and not n_boot:
+        raise ValueError("rank_by='lower_bound' requires n_boot > 0")
+    dims = list(dims)
+    max_depth = min(max_depth, len(dims))
+
+    # 每个周期只扫描一次明细，后续下钻都是 cube 上的索引查找 (全程使用字典编码后的 code)
+    cube_t0, cube_t1 = _as_cubes(data_t0, data_t1, dims, numerator, denominator)
+    total_t0 = (cube_t0.totals[numerator], cube_t0.totals[denominator])
+    total_t1 = (cube_t1.totals[numerator], cube_t1.totals[denominator])
+
+    expander = ParallelExpander(cube_t0, cube_t1, workers) if workers and workers > 1 else None
+    bootstrap = {"n_boot": n_boot, "alpha": alpha, "seed": np.random.default_rng(seed)} if n_boot else None
+    kept = _search(cube_t0, cube_t1, dims, numerator, denominator, total_t0, total_t1,
+                   beam_width, max_depth, min_support, direction, expander, bootstrap, rank_by)
+
+    # 只有最终结果表才把 code 映射回标签
+    for row in kept:
+        row["conditions"] = tuple((dim, cube_t0.decode(dim, code)) for dim, code in row["conditions"])
+        row["path"] = format_path(row["conditions"])
+
+    columns = ["path", "depth", "conditions", "score"] + EFFECT_COLUMNS + (CI_COLUMNS if n_boot else [])
+    results = pd.DataFrame(kept, columns=columns)
+    return results.sort_values(["score", "path"], ascending=[False, True], ignore_index=True)
+
+
+def _intervals(tables, total_t0, total_t1, bootstrap):
+    """
+    Bootstrap the children of every task of one depth in a single matrix pass (one rest node per task).
+
+    Returns one ``{column: array}`` of ``CI_COLUMNS`` per table.
+    """
+    sizes = [len(effects) for effects in tables]
+    if not sum(sizes):
+        return [{column: np.empty(0) for column in CI_COLUMNS} for _ in tables]
+    stacked = [np.concatenate([effects[column].to_numpy() for effects in tables])
+               for column in ("num_t0", "den_t0", "num_t1", "den_t1")]
+    intervals = bootstrap_effects(*stacked, total_t0, total_t1, groups=np.repeat(np.arange(len(tables)), sizes),
+                                  **bootstrap)
+    bounds = np.cumsum(sizes)[:-1]
+    parts = {column: np.split(intervals[column], bounds) for column in CI_COLUMNS}
+    return [{column: parts[column][i] for column in CI_COLUMNS} for i in range(len(tables))]
+
+
+def _search(cube_t0, cube_t1, dims, numerator, denominator, total_t0, total_t1,
+            beam_width, max_depth, min_support, direction, expander, bootstrap, rank_by):
+    frontier = [()]
+    kept = []
+    for depth in range(1, max_depth + 1):
+        tasks = [(conditions, dim) for conditions in frontier
+                 for dim in dims if dim not in {cond_dim for cond_dim, _ in conditions}]
+        if expander is None:
+            expanded = _expand_serial(cube_t0, cube_t1, tasks)
+        else:
+            expanded = expander.expand_all(tasks)
+
+        tables = [decompose_aggregates(child_t0, child_t1, numerator, denominator,
+                                       total_t0=total_t0, total_t1=total_t1)
+                  for child_t0, child_t1 in expanded]
+        # 整层所有任务的子节点一起做一次 bootstrap
+        intervals = _intervals(tables, total_t0, total_t1, bootstrap) if bootstrap is not None \
+            else [None] * len(tables)
+
+        seen = set()
+        candidates = []
+        for (conditions, dim), effects, bounds in zip(tasks, tables, intervals):
+            support = np.maximum(effects["weight_t0"].to_numpy(), effects["weight_t1"].to_numpy())
+            if rank_by == "lower_bound":
+                scores = np.asarray(score_lower_bound(bounds, direction))
+            else:
+                scores = _score(effects["contribution"].to_numpy(), direction)
+            for position, (value, row_support, score, row) in enumerate(zip(effects.index, support, scores,
+                                                                           effects.itertuples(index=False))):
+                if row_support < min_support or score <= 0:
+                    continue
+                child = conditions + ((dim, value),)
+                key = frozenset(child)
+                if key in seen:
+                    continue
+                seen.add(key)
+                fields = row._asdict()
+                if bounds is not None:
+                    fields.update((column, bounds[column][position]) for column in CI_COLUMNS)
+                candidates.append((score, child, fields))
+
+        if not candidates:
+            break
+        # 稳定排序：分数相同时按 (维度, code) 路径排，保证结果可复现
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        beam = candidates[:beam_width]
+        for score, child, fields in beam:
+            kept.append({"depth": depth, "conditions": child, "score": score, **fields})
+        frontier = [child for _, child, _ in beam]
+    return kept
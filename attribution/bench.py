@@ -0,0 +1,154 @@
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from attribution.beam import beam_search
+from attribution.cube import AttributionCube
+from attribution.encoding import ColumnStore, align_stores
+from attribution.engine import decompose_aggregates
+from attribution.ingest import DEFAULT_BATCH_ROWS, ingest_period
+from attribution.parallel import get_pool
+from attribution.synthetic import generate_period, synthetic_dimensions, write_period
+from attribution.timing import STAGES
+
+# -----------------------------------------------------------------------------
+# 分阶段基准测试 (Per-stage Benchmark Suite)
+# -----------------------------------------------------------------------------
+# 在合成的 mix-shift 场景上逐阶段跑一遍引擎，记录耗时、吞吐和峰值内存：
+#   ingest      Parquet 流式读取 + 分批聚合 (两个周期)
+#   encode      字符串维度列的字典编码 (factorize) + 两周期字典对齐
+#   aggregate   base cuboid + 物化到 max_depth 的全部 cuboid
+#   decompose   每个 ≤ max_depth 维组合的 Rate/Mix 分解
+#   beam_search 在只有 base cuboid 的 lazy cube 上做 Top-K 搜索 (含按需 roll-up，和直接传明细表时一致)；
+#               workers 列出的每个进程数各跑一次，与串行 (workers=1) 对比并行加速比
+# 峰值内存用 tracemalloc 统计 (Python + NumPy 堆，不含 Arrow 内存池)，是相对阶段开始时的增量。
+
+BENCH_COLUMNS = ["rows", "dims", "cardinality", "stage", "workers", "seconds", "items", "unit", "throughput",
+                 "peak_mb"]
+
+
+def _measure(func, trace_memory):
+    """Run ``func()``; return ``(result, seconds, peak MiB above the starting heap or None)``."""
+    if trace_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = (tracemalloc.get_traced_memory()[1] - baseline) / 2 ** 20 if trace_memory else None
+    return result, seconds, peak
+
+
+def _decompose_all(cube_t0, cube_t1, max_depth):
+    """Rate/Mix tables of every dimension combination up to ``max_depth``; returns the node count."""
+    totals_t0, totals_t1 = tuple(cube_t0.totals), tuple(cube_t1.totals)
+    nodes = 0
+    for size in range(1, max_depth + 1):
+        for subset in itertools.combinations(cube_t0.dims, size):
+            effects = decompose_aggregates(cube_t0.frame(subset), cube_t1.frame(subset), *cube_t0.measures,
+                                           total_t0=totals_t0, total_t1=totals_t1)
+            nodes += len(effects)
+    return nodes
+
+
+def _lazy(cube):
+    """Fresh cube over the same leaf cuboid, with nothing else materialized."""
+    return AttributionCube(cube.base, cube.categories, cube.measures)
+
+
+def run_benchmark(n_rows, n_dims=4, cardinality=2, max_depth=3, beam_width=3, min_support=0.01,
+                  stages=STAGES, seed=0, batch_rows=DEFAULT_BATCH_ROWS, workdir=None, trace_memory=True,
+                  workers=()):
+    """
+    Benchmark one synthetic configuration; returns a DataFrame with ``BENCH_COLUMNS``.
+
+    ``n_rows`` is the number of event rows *per period*. Data generation
+    (and writing the Parquet files for ``ingest``) is not timed. Stages not
+    listed in ``stages`` are still run when a later stage needs their output,
+    but are not reported. ``workdir`` holds the Parquet files (a temporary
+    directory by default). At ~10^8 rows the in-memory stages need several
+    GB; ``stages=("ingest",)`` streams from disk in bounded memory instead.
+
+    ``beam_search`` is timed serially and once more for each process count
+    in ``workers`` (pool start-up excluded), on the same data, so the
+    ``workers`` column shows the parallel speedup of the search.
+    """
+    unknown = set(stages).difference(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}; expected a subset of {STAGES}")
+    dims = list(synthetic_dimensions(n_dims, cardinality))
+    max_depth = min(max_depth, n_dims)
+    records = []
+
+    def record(stage, seconds, items, unit, peak, n_workers=1):
+        if stage in stages:
+            records.append({
+                "rows": n_rows, "dims": n_dims, "cardinality": cardinality, "stage": stage, "workers": n_workers,
+                "seconds": seconds, "items": items, "unit": unit,
+                "throughput": items / seconds if seconds > 0 else float("nan"), "peak_mb": peak,
+            })
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        if "ingest" in stages:
+            with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+                paths = [write_period(os.path.join(tmp, f"{period}.parquet"), n_rows, period, n_dims, cardinality,
+                                      seed, batch_rows) for period in ("T0", "T1")]
+                _, seconds, peak = _measure(lambda: [ingest_period(path, dims, batch_size=batch_rows)
+                                                     for path in paths], trace_memory)
+            record("ingest", seconds, 2 * n_rows, "rows", peak)
+
+        if not set(stages).difference({"ingest"}):
+            return pd.DataFrame(records, columns=BENCH_COLUMNS)
+
+        df_t0 = generate_period(n_rows, "T0", n_dims, cardinality, seed, batch_rows)
+        df_t1 = generate_period(n_rows, "T1", n_dims, cardinality, seed, batch_rows)
+        measures = ["clicks", "impressions"]
+        # 生成的维度已是 Categorical，from_frame 会直接复用其编码；
+        # 先转成普通字符串列 (不计时)，encode 阶段才测到真实的 factorize 开销
+        for df in (df_t0, df_t1):
+            df[dims] = df[dims].astype(str)
+
+        (store_t0, store_t1), seconds, peak = _measure(
+            lambda: align_stores(ColumnStore.from_frame(df_t0, dims, measures),
+                                 ColumnStore.from_frame(df_t1, dims, measures)), trace_memory)
+        record("encode", seconds, 2 * n_rows, "rows", peak)
+        del df_t0, df_t1
+
+        (cube_t0, cube_t1), seconds, peak = _measure(
+            lambda: (AttributionCube.from_store(store_t0, max_depth=max_depth),
+                     AttributionCube.from_store(store_t1, max_depth=max_depth)), trace_memory)
+        record("aggregate", seconds, 2 * n_rows, "rows", peak)
+        del store_t0, store_t1
+
+        if "decompose" in stages:
+            nodes, seconds, peak = _measure(lambda: _decompose_all(cube_t0, cube_t1, max_depth), trace_memory)
+            record("decompose", seconds, nodes, "nodes", peak)
+
+        if "beam_search" in stages:
+            for n_workers in [1] + [w for w in workers if w > 1]:
+                if n_workers > 1:
+                    list(get_pool(n_workers).map(abs, range(n_workers)))  # 预热：进程启动不计入搜索耗时
+                lazy_t0, lazy_t1 = _lazy(cube_t0), _lazy(cube_t1)
+                _, seconds, peak = _measure(
+                    lambda: beam_search(lazy_t0, lazy_t1, dims, beam_width=beam_width, max_depth=max_depth,
+                                        min_support=min_support, workers=n_workers), trace_memory)
+                record("beam_search", seconds, len(cube_t0.base), "leaf nodes", peak, n_workers)
+                del lazy_t0, lazy_t1
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return pd.DataFrame(records, columns=BENCH_COLUMNS)
+
+
+def run_suite(rows=(10 ** 4, 10 ** 5, 10 ** 6), dims=(4,), cardinalities=(2,), **kwargs):
+    """:func:`run_benchmark` over the grid ``rows × dims × cardinalities``, concatenated."""
+    frames = [run_benchmark(n_rows, n_dims, cardinality, **kwargs)
+              for n_rows, n_dims, cardinality in itertools.product(rows, dims, cardinalities)]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,141 @@
+import argparse
+import contextlib
+import os
+import sys
+
+import pandas as pd
+
+from attribution.beam import DIRECTIONS, beam_search
+from attribution.cube import AttributionCube, align_cubes
+from attribution.engine import decompose_aggregates, summarize_effects
+from attribution.ingest import DEFAULT_BATCH_ROWS
+from attribution.timing import STAGES, StageTimer
+
+# -----------------------------------------------------------------------------
+# 命令行入口 (python -m attribution)
+# -----------------------------------------------------------------------------
+#   generate  写出合成的 T0 / T1 Parquet 文件
+#   run       对两个周期的文件做 Rate/Mix 分解 + Beam Search
+#   bench     分阶段基准测试 (耗时 / 吞吐 / 峰值内存)
+# 不依赖 Streamlit，可直接用于离线分析、profiling 和 CI 中的性能回归检查。
+
+
+def _int(text):
+    """Integers that may be written as 1e6 or 1_000_000."""
+    return int(float(text.replace("_", "")))
+
+
+def _int_list(text):
+    return [_int(part) for part in text.split(",") if part]
+
+
+def _generate(args):
+    from attribution.synthetic import write_period
+
+    os.makedirs(args.out, exist_ok=True)
+    for period in ("T0", "T1"):
+        path = write_period(os.path.join(args.out, f"{period}.parquet"), args.rows, period, args.dims,
+                            args.cardinality, args.seed, args.batch_rows)
+        print(f"wrote {path} ({args.rows:,} rows)")
+    return 0
+
+
+def _run(args):
+    dims = args.dims.split(",")
+    measures = (args.numerator, args.denominator)
+    timer = StageTimer()
+    with timer if args.timings else contextlib.nullcontext():
+        # 只建 base cuboid：对齐字典 (recode) 只保留 base，之后 beam 按需 roll-up 访问到的 cuboid
+        cube_t0, cube_t1 = align_cubes(
+            AttributionCube.from_files(args.t0, dims, measures, batch_size=args.batch_rows),
+            AttributionCube.from_files(args.t1, dims, measures, batch_size=args.batch_rows),
+        )
+        summary = summarize_effects(decompose_aggregates(cube_t0.frame(dims[:1]), cube_t1.frame(dims[:1]),
+                                                         *measures))
+        results = beam_search(cube_t0, cube_t1, dims, *measures, beam_width=args.beam_width,
+                              max_depth=args.max_depth, min_support=args.min_support, direction=args.direction,
+                              workers=args.workers, n_boot=args.n_boot,
+                              rank_by="lower_bound" if args.n_boot else "point")
+
+    print(f"{args.numerator}/{args.denominator}: {summary['ratio_t0']:.4%} -> {summary['ratio_t1']:.4%} "
+          f"(delta {summary['delta']:+.4%}; rate {summary['rate_effect']:+.4%}, mix {summary['mix_effect']:+.4%} "
+          f"by {dims[0]})")
+    columns = ["path", "ratio_t0", "ratio_t1", "weight_t0", "weight_t1", "rate_effect", "mix_effect", "contribution"]
+    columns += [c for c in ("contribution_lo", "contribution_hi") if c in results]
+    with pd.option_context("display.width", 200, "display.max_colwidth", 80):
+        print(results[columns].to_string(index=False))
+    if args.output:
+        results.drop(columns=["conditions"]).to_csv(args.output, index=False)
+    if args.timings:
+        print(timer.frame().to_string(), file=sys.stderr)
+    return 0
+
+
+def _bench(args):
+    from attribution.bench import run_suite
+
+    stages = args.stages.split(",") if args.stages else STAGES
+    results = run_suite(args.rows, args.dims, args.cardinality, max_depth=args.max_depth,
+                        beam_width=args.beam_width, stages=stages, seed=args.seed, batch_rows=args.batch_rows,
+                        workdir=args.workdir, trace_memory=not args.no_memory, workers=args.workers)
+    if args.json:
+        print(results.to_json(orient="records", indent=2))
+    else:
+        with pd.option_context("display.width", 200, "display.float_format", "{:,.3f}".format):
+            print(results.to_string(index=False))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m attribution",
+                                     description="Rate/Mix attribution engine (no Streamlit required).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a synthetic mix-shift scenario (T0/T1 Parquet)")
+    generate.add_argument("--out", required=True, help="output directory")
+    generate.add_argument("--rows", type=_int, default=10 ** 6, help="rows per period (e.g. 1e8)")
+    generate.add_argument("--dims", type=int, default=4)
+    generate.add_argument("--cardinality", type=int, default=2)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--batch-rows", type=_int, default=DEFAULT_BATCH_ROWS)
+    generate.set_defaults(handler=_generate)
+
+    run = commands.add_parser("run", help="attribute the ratio change between two periods stored on disk")
+    run.add_argument("--t0", nargs="+", required=True, help="Parquet / CSV files or directories of the base period")
+    run.add_argument("--t1", nargs="+", required=True, help="Parquet / CSV files or directories of the current period")
+    run.add_argument("--dims", required=True, help="comma-separated dimension columns")
+    run.add_argument("--numerator", default="clicks")
+    run.add_argument("--denominator", default="impressions")
+    run.add_argument("--beam-width", type=int, default=3)
+    run.add_argument("--max-depth", type=int, default=3)
+    run.add_argument("--min-support", type=float, default=0.01)
+    run.add_argument("--direction", choices=DIRECTIONS, default="negative")
+    run.add_argument("--workers", type=int, default=None, help="processes for the lazy cuboid roll-ups (default: serial)")
+    run.add_argument("--n-boot", type=int, default=0, help="bootstrap replicates, count measures only (0: no confidence intervals)")
+    run.add_argument("--batch-rows", type=_int, default=DEFAULT_BATCH_ROWS)
+    run.add_argument("--output", help="write the beam search results to this CSV file")
+    run.add_argument("--timings", action="store_true", help="print per-stage timings to stderr")
+    run.set_defaults(handler=_run)
+
+    bench = commands.add_parser("bench", help="per-stage throughput and peak memory on synthetic data")
+    bench.add_argument("--rows", type=_int_list, default=[10 ** 4, 10 ** 5, 10 ** 6],
+                       help="comma-separated rows per period (e.g. 1e4,1e6,1e8)")
+    bench.add_argument("--dims", type=_int_list, default=[4], help="comma-separated dimension counts")
+    bench.add_argument("--cardinality", type=_int_list, default=[2], help="comma-separated cardinalities")
+    bench.add_argument("--stages", help=f"comma-separated subset of {','.join(STAGES)}")
+    bench.add_argument("--max-depth", type=int, default=3)
+    bench.add_argument("--beam-width", type=int, default=3)
+    bench.add_argument("--workers", type=_int_list, default=[],
+                       help="comma-separated process counts to time beam_search with, besides serial (e.g. 4,8)")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--batch-rows", type=_int, default=DEFAULT_BATCH_ROWS)
+    bench.add_argument("--workdir", help="directory for the temporary Parquet files of the ingest stage")
+    bench.add_argument("--no-memory", action="store_true", help="skip tracemalloc (slightly faster)")
+    bench.add_argument("--json", action="store_true", help="print JSON records instead of a table")
+    bench.set_defaults(handler=_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,189 @@
+import itertools
+
+import pandas as pd
+
+from attribution.encoding import ColumnStore, Cuboid, align_stores, labelled_frame, remap_codes, union_categories
+from attribution.ingest import DEFAULT_BATCH_ROWS, ingest_period
+from attribution.timing import timed_stage
+
+# -----------------------------------------------------------------------------
+# 预聚合 OLAP Cube (Pre-aggregated Cuboids + Roll-up)
+# -----------------------------------------------------------------------------
+# 每个周期只扫描一次明细数据，得到最细粒度的 base cuboid；
+# 更粗的 cuboid 从已物化的、更细的 cuboid 上 roll-up 得到，不再回扫原始行。
+# 下钻查询 (e.g. App_Version=v10.5 -> Channel=Search) 变成索引查找。
+# cuboid 全部保存字典编码后的 code，标签只在返回结果表时解码。
+
+
+class AttributionCube:
+    """
+    Sufficient statistics (measure sums) of one period for every dimension subset.
+
+    ``base`` is the leaf-level :class:`~attribution.encoding.Cuboid` over all
+    ``dims`` and ``categories`` the label dictionary of each dimension. Cuboids
+    are keyed by the set of dimensions they group by and always use the
+    canonical ``dims`` order.
+    """
+
+    def __init__(self, base, categories, measures):
+        self.dims = list(base.dims)
+        self.categories = list(categories)
+        self.measures = list(measures)
+        self._cuboids = {frozenset(self.dims): base}
+        self.totals = pd.Series(base.sums.sum(axis=1), index=self.measures)
+
+    @classmethod
+    @timed_stage("aggregate")
+    def from_store(cls, store, measures=None, max_depth=None):
+        """Build the cube of an encoded :class:`~attribution.encoding.ColumnStore`."""
+        measures = list(store.measures) if measures is None else list(measures)
+        cube = cls(store.group_sum(measures=measures), store.categories, measures)
+        if max_depth is not None:
+            cube.materialize(max_depth)
+        return cube
+
+    @classmethod
+    def from_frame(cls, df, dims, measures=("clicks", "impressions"), max_depth=None):
+        """Build the cube of an event table (one scan) and materialize cuboids up to ``max_depth`` dimensions."""
+        return cls.from_store(ColumnStore.from_frame(df, dims, measures), max_depth=max_depth)
+
+    @classmethod
+    def from_files(cls, paths, dims, measures=("clicks", "impressions"), max_depth=None,
+                   batch_size=DEFAULT_BATCH_ROWS):
+        """Build the cube of a period stored on disk, streaming it in bounded-memory batches."""
+        numerator, denominator = measures
+        agg = ingest_period(paths, dims, numerator, denominator, batch_size=batch_size)
+        return cls.from_frame(agg.reset_index(), dims, measures, max_depth=max_depth)
+
+    @classmethod
+    def build_pair(cls, df_t0, df_t1, dims, measures=("clicks", "impressions"), max_depth=None):
+        """Cubes of two periods encoded against shared dictionaries, ready for comparison."""
+        store_t0, store_t1 = align_stores(ColumnStore.from_frame(df_t0, dims, measures),
+                                          ColumnStore.from_frame(df_t1, dims, measures))
+        return (cls.from_store(store_t0, max_depth=max_depth),
+                cls.from_store(store_t1, max_depth=max_depth))
+
+    @property
+    def base(self):
+        """Leaf-level cuboid (grouped by every dimension)."""
+        return self._cuboids[frozenset(self.dims)]
+
+    @property
+    def dictionaries(self):
+        return dict(zip(self.dims, self.categories))
+
+    def recode(self, categories):
+        """
+        Same cube expressed against other (superset) dictionaries.
+
+        Only the leaf cuboid is carried over; align before materializing.
+        """
+        base = self.base
+        codes = [remap_codes(c, old, new) for c, old, new in zip(base.codes, self.categories, categories)]
+        rebuilt = Cuboid.group(self.dims, [len(labels) for labels in categories], codes, list(base.sums))
+        return AttributionCube(rebuilt, categories, self.measures)
+
+    def _ordered(self, dim_set):
+        return [dim for dim in self.dims if dim in dim_set]
+
+    def materialize(self, max_depth):
+        """
+        Eagerly build every cuboid with at most ``max_depth`` dimensions, finest first.
+
+        Worth it for cubes that serve many different drill-downs (e.g. the
+        app's interactive explorer). A single beam search visits only a few
+        of the C(n, ≤max_depth) cuboids, so it is cheaper on a lazy cube.
+        """
+        for size in range(len(self.dims) - 1, 0, -1):
+            if size > max_depth:
+                continue
+            for subset in itertools.combinations(self.dims, size):
+                self.cuboid(subset)
+        return self
+
+    def cuboid(self, dims):
+        """Encoded cuboid over ``dims``, rolled up from the smallest materialized superset."""
+        key = frozenset(dims)
+        unknown = key.difference(self.dims)
+        if unknown:
+            raise KeyError(f"Unknown dimensions: {sorted(unknown)}")
+        if key in self._cuboids:
+            return self._cuboids[key]
+
+        cuboid = self.rollup_source(key).rollup(self._ordered(key))
+        self._cuboids[key] = cuboid
+        return cuboid
+
+    def is_materialized(self, dims):
+        return frozenset(dims) in self._cuboids
+
+    def rollup_source(self, dims):
+        """Smallest materialized cuboid that strictly contains ``dims`` (the parent a roll-up reads)."""
+        key = frozenset(dims)
+        return self._cuboids[min((k for k in self._cuboids if key < k), key=lambda k: len(self._cuboids[k]))]
+
+    def add_cuboid(self, cuboid):
+        """Register a cuboid computed elsewhere (e.g. rolled up on a worker process)."""
+        self._cuboids.setdefault(frozenset(cuboid.dims), cuboid)
+
+    def frame(self, dims):
+        """Labelled measure table of the cuboid over ``dims``."""
+        return labelled_frame(self.cuboid(dims), self.measures, self.dictionaries)
+
+    def encode(self, conditions):
+        """``[(dim, label), ...]`` -> ``((dim, code), ...)``; ``None`` if a label is unknown."""
+        encoded = []
+        for dim, value in conditions:
+            labels = self.categories[self.dims.index(dim)]
+            if value not in labels:
+                return None
+            encoded.append((dim, labels.get_loc(value)))
+        return tuple(encoded)
+
+    def decode(self, dim, code):
+        return self.categories[self.dims.index(dim)][code]
+
+    def node_codes(self, conditions):
+        """Measure sums (array) of the node identified by encoded ``conditions``."""
+        if not conditions:
+            return self.totals.to_numpy()
+        fixed = dict(conditions)
+        cuboid = self.cuboid(fixed)
+        position = cuboid.locate(fixed)
+        if position is None:
+            return self.totals.to_numpy() * 0
+        return cuboid.sums[:, position]
+
+    def children_codes(self, conditions, dim):
+        """Measure sums of the children of encoded ``conditions`` along ``dim``, indexed by child code."""
+        fixed = dict(conditions)
+        if dim in fixed:
+            raise ValueError(f"{dim!r} is already part of the path")
+        cuboid = self.cuboid(list(fixed) + [dim])
+        child_codes, positions = cuboid.locate(fixed, free_dim=dim)
+        return pd.DataFrame(dict(zip(self.measures, cuboid.sums[:, positions])),
+                            index=pd.Index(child_codes, name=dim))
+
+    def node(self, conditions):
+        """Measure sums of the node identified by ``conditions`` (``[(dim, value), ...]``)."""
+        encoded = self.encode(conditions)
+        if encoded is None:
+            return self.totals * 0
+        return pd.Series(self.node_codes(encoded), index=self.measures)
+
+    def children(self, conditions, dim):
+        """Measure sums of the children of ``conditions`` along ``dim``, indexed by ``dim`` labels."""
+        encoded = self.encode(conditions)
+        if encoded is None:
+            return pd.DataFrame({m: [] for m in self.measures}, index=pd.Index([], name=dim))
+        children = self.children_codes(encoded, dim)
+        children.index = pd.Index(self.categories[self.dims.index(dim)].take(children.index), name=dim)
+        return children
+
+
+def align_cubes(cube_t0, cube_t1):
+    """Re-encode two cubes against shared dictionaries (no-op if they already share them)."""
+    if all(a.equals(b) for a, b in zip(cube_t0.categories, cube_t1.categories)):
+        return cube_t0, cube_t1
+    categories = union_categories(cube_t0.categories, cube_t1.categories)
+    return cube_t0.recode(categories), cube_t1.recode(categories)
@@ -0,0 +1,254 @@
+import numpy as np
+import pandas as pd
+
+from attribution.timing import timed_stage
+
+# -----------------------------------------------------------------------------
+# 字典编码列存 (Dictionary-encoded Column Store)
+# -----------------------------------------------------------------------------
+# 维度值 (Feed_Flow / Tier3_Cities / v10.5 ...) 是大量重复的字符串。
+# 每个维度编码成 uint8 / uint16 / uint32 的整数 code，group-by 变成
+# 组合 code (ravel multi-index) 上的 np.bincount；只有最终结果表才把 code 映射回标签。
+
+_MAX_KEY = 1 << 62
+# 组合 key 空间不超过 max(_DENSE_FACTOR * 行数, _DENSE_MIN) 时用稠密 bincount，否则排序去重
+_DENSE_FACTOR = 4
+_DENSE_MIN = 1 << 16
+
+
+def code_dtype(cardinality):
+    """Smallest unsigned integer dtype able to hold ``cardinality`` distinct codes."""
+    if cardinality <= np.iinfo(np.uint8).max + 1:
+        return np.uint8
+    if cardinality <= np.iinfo(np.uint16).max + 1:
+        return np.uint16
+    return np.uint32
+
+
+def _combine(codes, cardinalities, n_rows):
+    """
+    Combine code columns into one int64 key per row, preserving lexicographic order.
+
+    Returns ``(key, bound, exact)``. When the product of cardinalities fits in
+    int64 the key is the plain ravelled multi-index (``exact=True``);
+    otherwise the partial key is re-densified with ``np.unique`` on the way.
+    """
+    key = np.zeros(n_rows, dtype=np.int64)
+    bound, exact = 1, True
+    for column, cardinality in zip(codes, cardinalities):
+        cardinality = max(int(cardinality), 1)
+        if bound * cardinality >= _MAX_KEY:
+            uniques, key = np.unique(key, return_inverse=True)
+            bound, exact = len(uniques), False
+        key = key * cardinality + column.astype(np.int64)
+        bound *= cardinality
+    return key, bound, exact
+
+
+class Cuboid:
+    """
+    Measure sums grouped by a set of encoded dimensions.
+
+    ``codes`` holds one code array per dimension, ``sums`` has shape
+    ``(n_measures, n_cells)`` and ``keys`` is the sorted ravelled
+    multi-index of each cell (``None`` if the key space overflows int64).
+    """
+
+    def __init__(self, dims, cardinalities, codes, sums, keys):
+        self.dims = list(dims)
+        self.cardinalities = list(cardinalities)
+        self.codes = list(codes)
+        self.sums = sums
+        self.keys = keys
+        # ravel 顺序下每个维度的步长
+        self.strides = {}
+        stride = 1
+        for dim, cardinality in zip(reversed(self.dims), reversed(self.cardinalities)):
+            self.strides[dim] = stride
+            stride *= max(int(cardinality), 1)
+
+    def __len__(self):
+        return self.sums.shape[1]
+
+    @classmethod
+    def group(cls, dims, cardinalities, codes, weights):
+        """Group rows by ``codes`` (one array per dim) and sum each array in ``weights``."""
+        n_rows = len(codes[0]) if codes else len(weights[0])
+        key, bound, exact = _combine(codes, cardinalities, n_rows)
+
+        if exact and bound <= max(_DENSE_FACTOR * n_rows, _DENSE_MIN):
+            counts = np.bincount(key, minlength=bound)
+            cells = np.flatnonzero(counts)
+            sums = np.vstack([np.bincount(key, weights=w, minlength=bound)[cells] for w in weights])
+        else:
+            cells, inverse = np.unique(key, return_inverse=True)
+            sums = np.vstack([np.bincount(inverse, weights=w, minlength=len(cells)) for w in weights])
+
+        if exact:
+            unravelled = np.unravel_index(cells, [max(int(c), 1) for c in cardinalities]) if dims else []
+            group_codes = [u.astype(code_dtype(c)) for u, c in zip(unravelled, cardinalities)]
+            keys = cells
+        else:
+            first = np.empty(len(cells), dtype=np.int64)
+            first[inverse] = np.arange(n_rows)
+            group_codes = [column[first] for column in codes]
+            keys = None
+        return cls(dims, cardinalities, group_codes, sums, keys)
+
+    def rollup(self, dims):
+        """Coarser cuboid over ``dims`` (a subset, canonical order) computed from this one."""
+        positions = [self.dims.index(dim) for dim in dims]
+        return Cuboid.group(dims, [self.cardinalities[p] for p in positions],
+                            [self.codes[p] for p in positions], list(self.sums))
+
+    def locate(self, fixed, free_dim=None):
+        """
+        Positions of the cells matching ``fixed`` (``{dim: code}``).
+
+        With ``free_dim`` the cells are the children along that dimension and
+        ``(child_codes, positions)`` is returned; otherwise the position of the
+        single matching cell (or ``None``).
+        """
+        if self.keys is not None:
+            base = sum(int(code) * self.strides[dim] for dim, code in fixed.items())
+            if free_dim is None:
+                candidates = np.array([base], dtype=np.int64)
+                child_codes = np.zeros(1, dtype=np.int64)
+            else:
+                child_codes = np.arange(self.cardinalities[self.dims.index(free_dim)], dtype=np.int64)
+                candidates = base + child_codes * self.strides[free_dim]
+            positions = np.searchsorted(self.keys, candidates)
+            hit = positions < len(self.keys)
+            hit[hit] = self.keys[positions[hit]] == candidates[hit]
+            child_codes, positions = child_codes[hit], positions[hit]
+        else:
+            mask = np.ones(len(self), dtype=bool)
+            for dim, code in fixed.items():
+                mask &= self.codes[self.dims.index(dim)] == code
+            positions = np.flatnonzero(mask)
+            child_codes = self.codes[self.dims.index(free_dim)][positions] if free_dim is not None else None
+
+        if free_dim is None:
+            return positions[0] if len(positions) else None
+        return child_codes, positions
+
+
+class ColumnStore:
+    """
+    Dictionary-encoded dimensions plus float64 measure columns of one table.
+
+    ``categories[i]`` is the label dictionary (a ``pd.Index``) of ``dims[i]``
+    and ``codes[i]`` its compact integer codes. Rows with a missing
+    dimension value are dropped, like ``groupby`` does by default.
+    """
+
+    def __init__(self, dims, categories, codes, measures):
+        self.dims = list(dims)
+        self.categories = list(categories)
+        self.codes = list(codes)
+        self.measures = dict(measures)
+
+    @classmethod
+    @timed_stage("encode")
+    def from_frame(cls, df, dims, measures):
+        dims, measures = list(dims), list(measures)
+        categories, codes = [], []
+        valid = np.ones(len(df), dtype=bool)
+        for dim in dims:
+            column = df[dim]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column_codes, labels = column.cat.codes.to_numpy(), column.cat.categories
+            else:
+                column_codes, labels = pd.factorize(column, sort=True)
+                labels = pd.Index(labels, name=dim)
+            valid &= column_codes >= 0
+            categories.append(pd.Index(labels, name=dim))
+            codes.append(column_codes)
+
+        keep = None if valid.all() else valid
+        codes = [(c if keep is None else c[keep]).astype(code_dtype(len(labels)))
+                 for c, labels in zip(codes, categories)]
+        values = {m: df[m].to_numpy(dtype=np.float64) for m in measures}
+        if keep is not None:
+            values = {m: v[keep] for m, v in values.items()}
+        return cls(dims, categories, codes, values)
+
+    @property
+    def cardinalities(self):
+        return [len(labels) for labels in self.categories]
+
+    @property
+    def dictionaries(self):
+        """``{dim: labels}`` for decoding result tables."""
+        return dict(zip(self.dims, self.categories))
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.codes) + sum(v.nbytes for v in self.measures.values())
+
+    def recode(self, categories):
+        """Re-express the codes against ``categories`` (supersets of the current dictionaries)."""
+        codes = [remap_codes(c, old, new) for c, old, new in zip(self.codes, self.categories, categories)]
+        return ColumnStore(self.dims, categories, codes, self.measures)
+
+    def group_sum(self, dims=None, measures=None):
+        """:class:`Cuboid` of measure sums grouped by ``dims`` (default: every dimension)."""
+        dims = self.dims if dims is None else [dim for dim in self.dims if dim in set(dims)]
+        measures = list(self.measures) if measures is None else list(measures)
+        positions = [self.dims.index(dim) for dim in dims]
+        return Cuboid.group(dims, [self.cardinalities[p] for p in positions],
+                            [self.codes[p] for p in positions], [self.measures[m] for m in measures])
+
+
+def remap_codes(codes, old_categories, new_categories):
+    """Translate codes of ``old_categories`` into codes of ``new_categories``."""
+    lookup = new_categories.get_indexer(old_categories)
+    if (lookup < 0).any():
+        missing = list(old_categories[lookup < 0][:5])
+        raise ValueError(f"Labels missing from the new dictionary: {missing}")
+    return lookup.astype(code_dtype(len(new_categories)))[codes]
+
+
+def union_categories(*category_lists):
+    """Per-dimension union of several dictionaries (sorted where the labels allow it)."""
+    merged = []
+    for labels in zip(*category_lists):
+        union = labels[0]
+        for other in labels[1:]:
+            if not union.equals(other):
+                union = union.union(other)
+        merged.append(union)
+    return merged
+
+
+def align_stores(*stores):
+    """Re-encode several stores against shared dictionaries so their codes are comparable."""
+    categories = union_categories(*(store.categories for store in stores))
+    return [store.recode(categories) for store in stores]
+
+
+def code_index(cuboid):
+    """Integer index of a cuboid's cells (ravelled keys when available, else codes)."""
+    if cuboid.keys is not None:
+        return pd.Index(cuboid.keys)
+    return pd.MultiIndex.from_arrays(cuboid.codes, names=cuboid.dims)
+
+
+def decode_index(index, dims, cardinalities, dictionaries):
+    """Map an index produced by :func:`code_index` back to labels (``dictionaries``: ``{dim: labels}``)."""
+    if not dims:
+        return pd.RangeIndex(len(index))
+    if isinstance(index, pd.MultiIndex):
+        codes = [index.get_level_values(i).to_numpy() for i in range(len(dims))]
+    else:
+        codes = np.unravel_index(index.to_numpy(), [max(int(c), 1) for c in cardinalities])
+    labels = [dictionaries[dim].take(c) for dim, c in zip(dims, codes)]
+    if len(dims) == 1:
+        return pd.Index(labels[0], name=dims[0])
+    return pd.MultiIndex.from_arrays(labels, names=dims)
+
+
+def labelled_frame(cuboid, measures, dictionaries):
+    """Final result table of a cuboid: measure sums indexed by decoded labels."""
+    index = decode_index(code_index(cuboid), cuboid.dims, cuboid.cardinalities, dictionaries)
+    return pd.DataFrame(dict(zip(measures, cuboid.sums)), index=index)
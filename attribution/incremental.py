@@ -0,0 +1,172 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from attribution.beam import DIRECTIONS, _score
+from attribution.engine import EFFECT_COLUMNS, _safe_divide, aggregate_period
+
+# -----------------------------------------------------------------------------
+# 增量归因 (Incremental Attribution over a Sliding Window)
+# -----------------------------------------------------------------------------
+# T0 基期固定，T1 是一个滑动窗口：新的 micro-batch 进来、过期的 batch 移出。
+# 每个节点维护 (num, den) 累加器，以及与全局总量无关的"未归一化"中间量：
+#   rate_effect_i = (R1_i - R0_i) * den1_i / DEN1     -> 缓存 (R1_i - R0_i) * den1_i
+#   mix_effect_i  = den1_i * R0_i / DEN1 - W0_i * R0_i -> 缓存 den1_i * R0_i
+# 只有被 batch 触及的节点重新计算；读取时再整体除以当前的 DEN1 (一次向量化运算)。
+
+
+class IncrementalAttribution:
+    """
+    Running Rate/Mix attribution of a sliding T1 window against a fixed T0 baseline.
+
+    ``baseline`` is the T0 event table (or a pre-aggregated node table indexed
+    by ``dims``). Micro-batches are fed with :meth:`update`; batches older
+    than ``window`` (same unit as the timestamps, ``None`` keeps everything)
+    are expired. Each update costs time proportional to the nodes it touches.
+    """
+
+    def __init__(self, baseline, dims, numerator="clicks", denominator="impressions", window=None):
+        self.dims = list(dims)
+        self.numerator = numerator
+        self.denominator = denominator
+        self.window = window
+
+        self._ids = {}
+        self._keys = []
+        self._batches = deque()
+        self._capacity = 0
+        self._arrays = {}
+        self._grow(1024)
+
+        agg_t0 = baseline if self._is_aggregate(baseline) else aggregate_period(baseline, self.dims, numerator, denominator)
+        ids = self._node_ids(agg_t0.index)
+        self._arrays["num_t0"][ids] = agg_t0[numerator].to_numpy(dtype=np.float64)
+        self._arrays["den_t0"][ids] = agg_t0[denominator].to_numpy(dtype=np.float64)
+        self.total_t0 = np.array([agg_t0[numerator].sum(), agg_t0[denominator].sum()], dtype=np.float64)
+        self.total_t1 = np.zeros(2)
+
+        n = len(self._keys)
+        ratio_t0 = _safe_divide(self._arrays["num_t0"][:n], self._arrays["den_t0"][:n])
+        self._arrays["ratio_t0"][:n] = ratio_t0
+        self._arrays["mix_t0"][:n] = _safe_divide(self._arrays["den_t0"][:n], self.total_t0[1]) * ratio_t0
+
+    def _is_aggregate(self, data):
+        return list(data.index.names) == self.dims and self.numerator in data and self.denominator in data
+
+    def _grow(self, capacity):
+        names = ("num_t0", "den_t0", "ratio_t0", "mix_t0", "num_t1", "den_t1", "rate_u", "mix_u")
+        for name in names:
+            grown = np.zeros(capacity, dtype=np.float64)
+            if name in self._arrays:
+                grown[:self._capacity] = self._arrays[name]
+            self._arrays[name] = grown
+        self._capacity = capacity
+
+    def _node_ids(self, index):
+        """Stable integer id per node label, registering new nodes on first sight."""
+        ids = np.empty(len(index), dtype=np.int64)
+        for position, key in enumerate(index):
+            node_id = self._ids.get(key)
+            if node_id is None:
+                node_id = self._ids[key] = len(self._keys)
+                self._keys.append(key)
+            ids[position] = node_id
+        if len(self._keys) > self._capacity:
+            self._grow(max(2 * self._capacity, len(self._keys)))
+        return ids
+
+    @property
+    def n_nodes(self):
+        return len(self._keys)
+
+    def _refresh(self, ids):
+        """Recompute the cached, total-independent terms of the touched nodes only."""
+        a = self._arrays
+        ratio_t1 = _safe_divide(a["num_t1"][ids], a["den_t1"][ids])
+        a["rate_u"][ids] = (ratio_t1 - a["ratio_t0"][ids]) * a["den_t1"][ids]
+        a["mix_u"][ids] = a["den_t1"][ids] * a["ratio_t0"][ids]
+
+    def update(self, batch, timestamp):
+        """
+        Fold a micro-batch of T1 events observed at ``timestamp`` into the window.
+
+        Batches that fall out of the window are subtracted first. Returns the
+        number of nodes whose accumulators changed.
+        """
+        touched = []
+        if self.window is not None:
+            while self._batches and self._batches[0][0] <= timestamp - self.window:
+                _, ids, num, den = self._batches.popleft()
+                self._arrays["num_t1"][ids] -= num
+                self._arrays["den_t1"][ids] -= den
+                self.total_t1 -= (num.sum(), den.sum())
+                touched.append(ids)
+
+        agg = aggregate_period(batch, self.dims, self.numerator, self.denominator)
+        ids = self._node_ids(agg.index)
+        num = agg[self.numerator].to_numpy(dtype=np.float64)
+        den = agg[self.denominator].to_numpy(dtype=np.float64)
+        self._arrays["num_t1"][ids] += num
+        self._arrays["den_t1"][ids] += den
+        self.total_t1 += (num.sum(), den.sum())
+        self._batches.append((timestamp, ids, num, den))
+        touched.append(ids)
+
+        touched = np.unique(np.concatenate(touched))
+        self._refresh(touched)
+        return len(touched)
+
+    def effects(self, ids=None):
+        """Current Rate/Mix effects of every node, or of node ``ids`` (same columns as ``decompose_rate_mix``)."""
+        if ids is None:
+            ids = np.arange(len(self._keys))
+        a = {name: values[ids] for name, values in self._arrays.items()}
+        inv_den_t1 = 1.0 / self.total_t1[1] if self.total_t1[1] else 0.0
+        rate_effect = a["rate_u"] * inv_den_t1
+        mix_effect = a["mix_u"] * inv_den_t1 - a["mix_t0"]
+        effects = pd.DataFrame({
+            "num_t0": a["num_t0"], "den_t0": a["den_t0"],
+            "num_t1": a["num_t1"], "den_t1": a["den_t1"],
+            "ratio_t0": a["ratio_t0"], "ratio_t1": _safe_divide(a["num_t1"], a["den_t1"]),
+            "weight_t0": _safe_divide(a["den_t0"], self.total_t0[1]),
+            "weight_t1": a["den_t1"] * inv_den_t1,
+            "rate_effect": rate_effect, "mix_effect": mix_effect,
+            "contribution": rate_effect + mix_effect,
+        }, index=self._index(ids))
+        return effects[EFFECT_COLUMNS]
+
+    def top_contributors(self, k=5, direction="negative"):
+        """
+        The ``k`` nodes with the largest contribution right now in ``direction``.
+
+        ``direction`` is one of ``DIRECTIONS`` as in ``beam_search``:
+        ``"negative"`` (drivers of a drop), ``"positive"`` (drivers of a rise)
+        or ``"absolute"`` (largest movers either way).
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}, got {direction!r}")
+        n = len(self._keys)
+        inv_den_t1 = 1.0 / self.total_t1[1] if self.total_t1[1] else 0.0
+        contribution = (self._arrays["rate_u"][:n] + self._arrays["mix_u"][:n]) * inv_den_t1 \
+            - self._arrays["mix_t0"][:n]
+        score = _score(contribution, direction)
+        k = min(k, n)
+        if k == 0:
+            return self.effects(np.arange(0))
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.argsort(-score[top], kind="stable")]
+        return self.effects(top)
+
+    def _index(self, ids):
+        keys = [self._keys[i] for i in ids]
+        if len(self.dims) == 1:
+            return pd.Index(keys, name=self.dims[0])
+        return pd.MultiIndex.from_tuples(keys, names=self.dims)
+
+    def summary(self):
+        """Global ratios of the baseline and the current window."""
+        ratio_t0 = self.total_t0[0] / self.total_t0[1] if self.total_t0[1] else 0.0
+        ratio_t1 = self.total_t1[0] / self.total_t1[1] if self.total_t1[1] else 0.0
+        return {"ratio_t0": ratio_t0, "ratio_t1": ratio_t1, "delta": ratio_t1 - ratio_t0,
+                "window_batches": len(self._batches), "nodes": len(self._keys)}
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from attribution.timing import timed_stage
+
+# -----------------------------------------------------------------------------
+# 流式分批读取 (Out-of-core Chunked Ingestion)
+# -----------------------------------------------------------------------------
+# 多 GB 的 Parquet / CSV 周期数据按批读取 (Parquet 走 memory-map)，
+# 每一批先在 Arrow 里 group-by，再折叠进按节点累加的 sum 累加器。
+# 峰值内存 ~ O(batch_size + 不同节点数)，与总行数无关。
+
+DEFAULT_BATCH_ROWS = 1_000_000
+_CSV_BLOCK_BYTES = 64 << 20
+
+
+def _as_paths(paths):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    expanded = []
+    for path in paths:
+        path = os.fspath(path)
+        if os.path.isdir(path):
+            expanded.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                   if name.endswith((".parquet", ".csv"))))
+        else:
+            expanded.append(path)
+    return expanded
+
+
+def iter_batches(paths, columns, batch_size=DEFAULT_BATCH_ROWS, text_columns=()):
+    """
+    Yield ``pyarrow.RecordBatch`` objects with only ``columns`` from Parquet / CSV files.
+
+    ``paths`` may be a file, a directory of ``.parquet`` / ``.csv`` files, or a
+    list of either. Parquet files are memory-mapped and read row group by row
+    group; CSV files are streamed block by block, so neither is ever fully
+    materialized. Batches hold at most ``batch_size`` rows for both formats
+    (CSV blocks are parsed at up to 64 MiB and sliced).
+
+    ``text_columns`` (e.g. the dimensions) are read from CSV as strings
+    instead of letting Arrow infer their type from the first block, so labels
+    such as ``"10"`` / ``"1.5"`` stay labels and a later non-numeric value
+    cannot fail the conversion.
+    """
+    columns = list(columns)
+    column_types = {column: pa.string() for column in text_columns}
+    for path in _as_paths(paths):
+        if path.endswith(".csv"):
+            reader = pa_csv.open_csv(
+                path,
+                read_options=pa_csv.ReadOptions(block_size=_CSV_BLOCK_BYTES),
+                convert_options=pa_csv.ConvertOptions(include_columns=columns, column_types=column_types),
+            )
+            for batch in reader:
+                # CSV 按字节分块解析；再切成 batch_size 行，和 Parquet 的批大小一致
+                for start in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(start, batch_size)
+        else:
+            parquet_file = pq.ParquetFile(path, memory_map=True)
+            yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+
+def _aggregate_batch(batch, dims, measures):
+    """Per-node measure sums of one Arrow batch, as a pandas DataFrame with plain columns."""
+    table = pa.Table.from_batches([batch])
+    if not dims:
+        return pd.DataFrame({m: [pc.sum(table[m]).as_py() or 0] for m in measures})
+    grouped = table.group_by(dims).aggregate([(m, "sum") for m in measures])
+    return grouped.to_pandas().rename(columns={f"{m}_sum": m for m in measures})
+
+
+def _compact(partials, dims, measures):
+    frame = pd.concat(partials, ignore_index=True)
+    if not dims:
+        return frame[measures].sum().to_frame().T
+    return frame.groupby(dims, observed=True, sort=False)[measures].sum().reset_index()
+
+
+@timed_stage("ingest")
+def ingest_period(paths, dims, numerator="clicks", denominator="impressions",
+                  batch_size=DEFAULT_BATCH_ROWS, compact_every=None):
+    """
+    Stream a period from disk into leaf-level node aggregates in bounded memory.
+
+    Each batch is reduced to per-node sums straight away; partial results are
+    folded into the running accumulator whenever they outgrow it (or
+    ``compact_every`` partial rows, if given). The output has the same shape as
+    :func:`attribution.aggregate_period`, so it can go straight into
+    ``decompose_aggregates`` or ``AttributionCube``.
+    """
+    dims = list(dims)
+    measures = [numerator, denominator]
+
+    accumulator = None
+    partials = []
+    pending_rows = 0
+    for batch in iter_batches(paths, dims + measures, batch_size=batch_size, text_columns=dims):
+        if batch.num_rows == 0:
+            continue
+        partial = _aggregate_batch(batch, dims, measures)
+        partials.append(partial)
+        pending_rows += len(partial)
+
+        # 累加器行数 ~ 不同节点数；待合并的部分结果超过它时折叠一次
+        threshold = compact_every or max(len(accumulator) if accumulator is not None else 0, batch_size)
+        if pending_rows >= threshold:
+            if accumulator is not None:
+                partials.insert(0, accumulator)
+            accumulator = _compact(partials, dims, measures)
+            partials, pending_rows = [], 0
+
+    if partials or accumulator is None:
+        if accumulator is not None:
+            partials.insert(0, accumulator)
+        accumulator = _compact(partials, dims, measures) if partials else pd.DataFrame(columns=dims + measures)
+
+    if not dims:
+        return accumulator.astype(np.float64)
+    agg = accumulator.set_index(dims).sort_index()
+    return agg[measures].astype(np.float64)
@@ -0,0 +1,152 @@
+import atexit
+import os
+import sys
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from attribution.encoding import Cuboid
+
+# -----------------------------------------------------------------------------
+# 多进程并行 Roll-up (Process-pool Cuboid Roll-ups for Beam Search)
+# -----------------------------------------------------------------------------
+# 展开一个 frontier 节点本身只是已物化 cuboid 上的 searchsorted 查找，远比进程间通信便宜；
+# 真正的计算量在于 roll-up 出尚未物化的 cuboid (扫一遍父 cuboid 做 bincount)。
+# 因此每一层先找出本层任务需要、但两个 cube 都还没有的 cuboid，把它们的 roll-up 分给进程池，
+# 再用和串行完全相同的 cube 查找展开节点 —— 结果与串行逐位一致。
+# 父 cuboid (通常是 base cuboid 的编码列) 每个 cube 只拷进共享内存一次，之后的搜索直接复用；
+# worker 进程按段名缓存已 attach 的数组，只有 roll-up 出来的小 cuboid 需要 pickle 回主进程。
+
+_POOLS = {}
+# cube -> {frozenset(dims): (SharedMemory, spec)}；cube 被回收时自动 unlink
+_SHARED = weakref.WeakKeyDictionary()
+# worker 进程内：段名 -> (SharedMemory, Cuboid)，LRU
+_ATTACHED = OrderedDict()
+_MAX_ATTACHED = 8
+
+
+def get_pool(workers=None):
+    """Process pool with ``workers`` processes, created on first use and reused afterwards."""
+    workers = workers or os.cpu_count()
+    if workers not in _POOLS:
+        # worker 必须和主进程共用同一个 resource tracker；否则各自起的 tracker
+        # 会在 worker 退出时把仍在使用的共享内存段当作泄漏 unlink 掉
+        resource_tracker.ensure_running()
+        _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _POOLS[workers]
+
+
+@atexit.register
+def shutdown_pools():
+    """Shut down every pool created by :func:`get_pool`."""
+    for pool in _POOLS.values():
+        pool.shutdown()
+    _POOLS.clear()
+
+
+def _to_shared(cuboid):
+    """Copy a cuboid's code and sum arrays into one shared-memory segment."""
+    arrays = [np.ascontiguousarray(codes) for codes in cuboid.codes] + [np.ascontiguousarray(cuboid.sums)]
+    layout, offset = [], 0
+    for array in arrays:
+        offset = -(-offset // 8) * 8  # 8 字节对齐
+        layout.append((offset, array.shape, array.dtype.str))
+        offset += array.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for array, (start, shape, dtype) in zip(arrays, layout):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)[...] = array
+    return shm, (shm.name, cuboid.dims, cuboid.cardinalities, layout)
+
+
+def _release(segments):
+    for shm, _ in segments.values():
+        shm.close()
+        shm.unlink()
+    segments.clear()
+
+
+def share_cuboid(cube, cuboid):
+    """Worker-side spec of ``cuboid`` (a cuboid of ``cube``), copied into shared memory on first use."""
+    segments = _SHARED.get(cube)
+    if segments is None:
+        segments = _SHARED[cube] = {}
+        weakref.finalize(cube, _release, segments)
+    key = frozenset(cuboid.dims)
+    if key not in segments:
+        segments[key] = _to_shared(cuboid)
+    return segments[key][1]
+
+
+def release_shared(cube):
+    """Free the shared-memory copies of ``cube`` now instead of when it is garbage collected."""
+    _release(_SHARED.get(cube, {}))
+
+
+def _attach(spec):
+    name, dims, cardinalities, layout = spec
+    if name in _ATTACHED:
+        _ATTACHED.move_to_end(name)
+        return _ATTACHED[name][1]
+    # 只有创建者 (主进程) 负责 unlink
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=name)
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start) for start, shape, dtype in layout]
+    _ATTACHED[name] = (shm, Cuboid(dims, cardinalities, arrays[:-1], arrays[-1], None))
+    while len(_ATTACHED) > _MAX_ATTACHED:
+        old_shm, old_cuboid = _ATTACHED.popitem(last=False)[1]
+        # 先丢掉引用共享内存的数组视图，才能 close
+        del old_cuboid
+        try:
+            old_shm.close()
+        except BufferError:  # 仍有数组视图存活时留给进程退出时回收
+            pass
+    return _ATTACHED[name][1]
+
+
+def _rollup_task(parent, dims):
+    """Worker: roll the shared parent cuboid up to ``dims`` (same code path as ``Cuboid.rollup``)."""
+    return _attach(parent).rollup(dims)
+
+
+class ParallelExpander:
+    """
+    Expand beam-search frontier nodes of two cubes, rolling up missing cuboids on a process pool.
+
+    The two cubes must share dictionaries (see ``align_cubes``). Each roll-up
+    reads the same parent cuboid the serial path would, shared with the
+    workers once per cube (see :func:`share_cuboid`), and the result is
+    added to the cube, so later lookups and later searches on the same cubes
+    reuse it. When every cuboid a depth needs is already materialized the
+    pool is not used at all. Results are identical to the serial cube lookups.
+    """
+
+    def __init__(self, cube_t0, cube_t1, workers=None):
+        self.cubes = (cube_t0, cube_t1)
+        self.workers = workers
+
+    def prepare(self, dim_sets):
+        """Materialize the cuboids over each of ``dim_sets`` in both cubes, in parallel."""
+        jobs = []
+        for cube in self.cubes:
+            for dim_set in dict.fromkeys(frozenset(dims) for dims in dim_sets):
+                if not cube.is_materialized(dim_set):
+                    parent = share_cuboid(cube, cube.rollup_source(dim_set))
+                    jobs.append((cube, parent, [dim for dim in cube.dims if dim in dim_set]))
+        if not jobs:
+            return
+        pool = get_pool(self.workers)
+        futures = [pool.submit(_rollup_task, parent, dims) for _, parent, dims in jobs]
+        for (cube, _, _), future in zip(jobs, futures):
+            cube.add_cuboid(future.result())
+
+    def expand_all(self, tasks):
+        """``[(encoded conditions, dim), ...]`` -> ``[(children_t0, children_t1), ...]`` in the same order."""
+        self.prepare([[cond_dim for cond_dim, _ in conditions] + [dim] for conditions, dim in tasks])
+        cube_t0, cube_t1 = self.cubes
+        return [(cube_t0.children_codes(conditions, dim), cube_t1.children_codes(conditions, dim))
+                for conditions, dim in tasks]
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+from attribution.encoding import ColumnStore, Cuboid
+from attribution.engine import EFFECT_COLUMNS, decompose_arrays
+from attribution.timing import timed
+
+# -----------------------------------------------------------------------------
+# 多周期批量归因 (Batch Attribution over Consecutive Periods)
+# -----------------------------------------------------------------------------
+# 90 天逐日 (或逐小时) 的 day-over-day 归因：每个周期只聚合一次，
+# 既作为前一组对比的 T1，也作为后一组对比的 T0；
+# 所有相邻周期对在 (nodes, periods) 矩阵上一次性完成 Rate/Mix 分解。
+# 周期顺序可以显式传入；没有任何数据的周期默认报错，而不是被悄悄跳过。
+
+
+MISSING_PERIODS = ("raise", "skip", "zero")
+
+
+def attribute_periods(df, period_col, dims, numerator="clicks", denominator="impressions", periods=None,
+                      missing="raise"):
+    """
+    Rate/Mix decomposition of every pair of consecutive periods in ``df``.
+
+    ``period_col`` holds the period label of each event (day, hour, ...).
+    ``periods`` gives the chronological order explicitly; rows of other
+    periods are ignored. Without it the column's own order is used: sorted
+    labels, or the category order of a categorical column, so plain labels
+    must sort chronologically (ISO dates, timestamps, zero-padded hours).
+    One encoded group-by over ``(period, *dims)`` produces a
+    ``(nodes, periods)`` matrix per measure, and ``decompose_arrays``
+    handles all ``periods - 1`` comparisons at once.
+
+    ``missing`` decides what happens to periods without any rows (listed in
+    ``periods`` or declared categories): ``"raise"`` (default) reports them,
+    ``"skip"`` drops them so their neighbours are compared directly, and
+    ``"zero"`` keeps them as zero-traffic periods.
+
+    Returns a long-format DataFrame with ``period_t0``, ``period_t1``, the
+    ``dims`` and the ``EFFECT_COLUMNS``; nodes absent from both periods of a
+    pair are omitted.
+    """
+    if missing not in MISSING_PERIODS:
+        raise ValueError(f"missing must be one of {MISSING_PERIODS}, got {missing!r}")
+    dims = list(dims)
+    measures = [numerator, denominator]
+    store = ColumnStore.from_frame(df, [period_col] + dims, measures)
+    with timed("aggregate"):
+        cells = store.group_sum()
+
+    # 周期标签 code -> 时间轴上的列号；不在 periods 里的周期为 -1，对应的 cell 直接忽略
+    labels = store.categories[0]
+    if periods is None:
+        periods = labels
+    else:
+        periods = pd.Index(periods, name=period_col)
+        if periods.has_duplicates:
+            raise ValueError(f"periods must be unique, got duplicates {list(periods[periods.duplicated()][:5])}")
+    columns = periods.get_indexer(labels)[cells.codes[0]]
+    listed = columns >= 0
+    observed = np.zeros(len(periods), dtype=bool)
+    observed[columns[listed]] = True
+    if not observed.all():
+        absent = list(periods[~observed])
+        if missing == "raise":
+            raise ValueError(f"No rows for {len(absent)} period(s) {absent[:5]}; "
+                             f"pass missing='skip' or missing='zero' to attribute around them")
+        if missing == "skip":
+            columns[listed] = (np.cumsum(observed) - 1)[columns[listed]]
+            periods = periods[observed]
+
+    # 每个 cell 的节点 id: 在维度 code 上再 group 一次 (只在聚合后的 cell 上，不回扫明细)
+    nodes = Cuboid.group(dims, store.cardinalities[1:], cells.codes[1:], [np.ones(len(cells))])
+    if nodes.keys is not None:
+        node_keys = nodes.keys
+        cell_keys = np.zeros(len(cells), dtype=np.int64)
+        for dim, codes in zip(dims, cells.codes[1:]):
+            cell_keys += codes.astype(np.int64) * nodes.strides[dim]
+        node_ids = np.searchsorted(node_keys, cell_keys)
+    else:
+        _, node_ids = np.unique(np.vstack(cells.codes[1:]), axis=1, return_inverse=True)
+        node_ids = node_ids.ravel()
+
+    shape = (len(nodes), len(periods))
+    num = np.zeros(shape)
+    den = np.zeros(shape)
+    num[node_ids[listed], columns[listed]] = cells.sums[0][listed]
+    den[node_ids[listed], columns[listed]] = cells.sums[1][listed]
+
+    effects = decompose_arrays(num[:, :-1], den[:, :-1], num[:, 1:], den[:, 1:])
+
+    # (nodes, pairs) -> 长表，去掉两期都不存在的节点
+    present = (den[:, :-1] != 0) | (den[:, 1:] != 0) | (num[:, :-1] != 0) | (num[:, 1:] != 0)
+    node_index, pair_index = np.nonzero(present.T)[::-1]
+    long = pd.DataFrame({
+        "period_t0": periods.take(pair_index),
+        "period_t1": periods.take(pair_index + 1),
+    })
+    for dim, labels, codes in zip(dims, store.categories[1:], nodes.codes):
+        long[dim] = labels.take(codes[node_index])
+    for column in EFFECT_COLUMNS:
+        long[column] = effects[column][node_index, pair_index]
+    return long
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from attribution.encoding import code_dtype
+
+# -----------------------------------------------------------------------------
+# 合成数据生成 (Synthetic Mix-shift Scenario)
+# -----------------------------------------------------------------------------
+# app.py Tab 3 演示场景的唯一定义 (demo_events)，并可任意放大 (10^4 ~ 10^8 行)：
+#   - Mix：Feed_Flow (低 CTR) 的流量占比从 50% 涨到 80%，拉低大盘 CTR；
+#   - Rate：T1 整体 CTR ×0.995，Channel=Search & App_Version=v10.5 再 ×0.8。
+# 维度数和基数可调；前 4 个维度沿用演示里的名字和取值，超出部分自动补齐。
+# 同一个 seed 下两个周期共享维度取值和 CTR 系数，只有流量结构和 Rate 冲击不同。
+
+DEMO_DIMENSIONS = {
+    "Channel": ["Feed_Flow", "Search"],
+    "App_Version": ["v10.4", "v10.5"],
+    "User_Tag": ["New_User", "Returning_User"],
+    "Region": ["Tier1_Cities", "Tier3_Cities"],
+}
+_DEMO_SHARES = {
+    "T0": {"Channel": [0.5, 0.5], "App_Version": [0.9, 0.1], "User_Tag": [0.4, 0.6], "Region": [0.8, 0.2]},
+    "T1": {"Channel": [0.8, 0.2], "App_Version": [0.9, 0.1], "User_Tag": [0.4, 0.6], "Region": [0.65, 0.35]},
+}
+_DEMO_CTR_FACTORS = {
+    "Channel": [0.033, 0.067],
+    "App_Version": [1.0, 1.0],
+    "User_Tag": [0.9, 1.0667],
+    "Region": [1.05, 0.8],
+}
+DEMO_IMPRESSIONS = {"T0": 100_000, "T1": 120_000}  # 演示中 T1 曝光涨了
+PERIODS = ("T0", "T1")
+
+
+def synthetic_dimensions(n_dims=4, cardinality=2):
+    """``{dim: labels}`` of the scenario: the demo dimensions first, padded with ``Dim_<i>`` ones."""
+    dimensions = {}
+    for position in range(n_dims):
+        if position < len(DEMO_DIMENSIONS):
+            dim = list(DEMO_DIMENSIONS)[position]
+            labels = DEMO_DIMENSIONS[dim][:cardinality]
+        else:
+            dim, labels = f"Dim_{position + 1}", []
+        labels += [f"{dim}_{value}" for value in range(len(labels), cardinality)]
+        dimensions[dim] = labels
+    return dimensions
+
+
+def _zipf(cardinality, exponent=1.1):
+    weights = 1.0 / np.arange(1, cardinality + 1) ** exponent
+    return weights / weights.sum()
+
+
+def _scenario(dimensions, seed):
+    """Per-dimension traffic shares of both periods and multiplicative CTR factors."""
+    rng = np.random.default_rng(seed)
+    shares = {period: {} for period in PERIODS}
+    factors = {}
+    for position, (dim, labels) in enumerate(dimensions.items()):
+        cardinality = len(labels)
+        if cardinality == 2 and dim in _DEMO_SHARES["T0"]:
+            for period in PERIODS:
+                shares[period][dim] = np.array(_DEMO_SHARES[period][dim])
+            factors[dim] = np.array(_DEMO_CTR_FACTORS[dim])
+            continue
+
+        if position == 0:
+            # Channel：Feed_Flow 在 T1 吃掉 80% 流量，其余渠道按原比例分剩下的 20%
+            shares["T0"][dim] = np.full(cardinality, 1.0 / cardinality)
+            shifted = np.full(cardinality, 0.2 / max(cardinality - 1, 1))
+            shifted[0] = 0.8 if cardinality > 1 else 1.0
+            shares["T1"][dim] = shifted
+            base = _DEMO_CTR_FACTORS["Channel"] + list(rng.uniform(0.02, 0.08, size=max(cardinality - 2, 0)))
+            factors[dim] = np.array(base[:cardinality])
+        else:
+            share = _zipf(cardinality)
+            shares["T0"][dim] = shares["T1"][dim] = share
+            factors[dim] = np.exp(rng.normal(0.0, 0.1, size=cardinality))
+    return shares, factors
+
+
+def _expected_ctr(period, dims, factors, codes):
+    """Expected CTR of each row from its dimension codes, including the T1 Rate shocks."""
+    ctr = factors[dims[0]][codes[0]]
+    for dim, dim_codes in zip(dims[1:], codes[1:]):
+        ctr = ctr * factors[dim][dim_codes]
+    if period == "T1":
+        ctr *= 0.995
+        if len(dims) > 1:
+            ctr[(codes[0] == 1) & (codes[1] == 1)] *= 0.8  # Search × v10.5 真的跌了
+    return np.clip(ctr, 0.0, 1.0)
+
+
+def _generate_batch(n_rows, period, dimensions, shares, factors, rng, mean_impressions):
+    codes = [rng.choice(len(labels), size=n_rows, p=shares[period][dim]).astype(code_dtype(len(labels)))
+             for dim, labels in dimensions.items()]
+    ctr = _expected_ctr(period, list(dimensions), factors, codes)
+
+    impressions = rng.poisson(mean_impressions - 1, size=n_rows) + 1
+    clicks = rng.binomial(impressions, ctr)
+    columns = {dim: pd.Categorical.from_codes(dim_codes, categories=labels)
+               for (dim, labels), dim_codes in zip(dimensions.items(), codes)}
+    columns["clicks"] = clicks
+    columns["impressions"] = impressions
+    return pd.DataFrame(columns)
+
+
+def demo_events(period="T0"):
+    """
+    Node-level (clicks, impressions) table of the 4-dimension demo scenario.
+
+    One row per combination of ``DEMO_DIMENSIONS`` labels carrying its
+    expected traffic (``DEMO_IMPRESSIONS`` split by the period's shares) and
+    expected clicks, with no sampling noise. This is the data behind the
+    app's attribution tab; :func:`generate_period` samples event rows from
+    the same scenario.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}, got {period!r}")
+    dims = list(DEMO_DIMENSIONS)
+    shares, factors = _scenario(DEMO_DIMENSIONS, seed=0)
+    codes = list(np.indices([len(labels) for labels in DEMO_DIMENSIONS.values()]).reshape(len(dims), -1))
+    weight = shares[period][dims[0]][codes[0]]
+    for dim, dim_codes in zip(dims[1:], codes[1:]):
+        weight = weight * shares[period][dim][dim_codes]
+
+    impressions = np.round(DEMO_IMPRESSIONS[period] * weight).astype(np.int64)
+    clicks = np.round(impressions * _expected_ctr(period, dims, factors, codes)).astype(np.int64)
+    columns = {dim: np.array(DEMO_DIMENSIONS[dim], dtype=object)[dim_codes] for dim, dim_codes in zip(dims, codes)}
+    columns["clicks"] = clicks
+    columns["impressions"] = impressions
+    return pd.DataFrame(columns)
+
+
+def iter_synthetic_batches(n_rows, period="T0", n_dims=4, cardinality=2, seed=0,
+                           batch_rows=1_000_000, mean_impressions=20):
+    """
+    Yield the ``n_rows`` event rows of one period as DataFrames of at most ``batch_rows`` rows.
+
+    Dimensions are categorical columns, ``clicks`` / ``impressions`` are
+    integer counts. Output is deterministic for a given ``seed`` and
+    ``batch_rows``, and memory stays bounded by the batch size. ``n_rows=0``
+    yields a single empty batch, so the column types are still known.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}, got {period!r}")
+    if n_rows < 0:
+        raise ValueError(f"n_rows must be >= 0, got {n_rows}")
+    dimensions = synthetic_dimensions(n_dims, cardinality)
+    shares, factors = _scenario(dimensions, seed)
+    rng = np.random.default_rng([seed, PERIODS.index(period)])
+    # 0 行时也产出一个空 batch：下游的 concat / Parquet schema 仍然有列类型可用
+    for start in range(0, max(n_rows, 1), batch_rows):
+        yield _generate_batch(min(batch_rows, n_rows - start), period, dimensions, shares, factors, rng,
+                              mean_impressions)
+
+
+def generate_period(n_rows, period="T0", n_dims=4, cardinality=2, seed=0, batch_rows=1_000_000,
+                    mean_impressions=20):
+    """Event table of one period held in memory (see :func:`iter_synthetic_batches`)."""
+    batches = list(iter_synthetic_batches(n_rows, period, n_dims, cardinality, seed, batch_rows, mean_impressions))
+    if len(batches) == 1:
+        return batches[0]
+    return pd.concat(batches, ignore_index=True)
+
+
+def write_period(path, n_rows, period="T0", n_dims=4, cardinality=2, seed=0, batch_rows=1_000_000,
+                 mean_impressions=20):
+    """
+    Write one period to a Parquet file batch by batch (one row group per batch).
+
+    Suitable for 10^8-row periods: only one batch is in memory at a time.
+    ``n_rows=0`` writes an empty file with the usual schema. Returns ``path``.
+    """
+    writer = None
+    try:
+        for batch in iter_synthetic_batches(n_rows, period, n_dims, cardinality, seed, batch_rows,
+                                            mean_impressions):
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
@@ -0,0 +1,91 @@
+import functools
+import time
+from contextlib import contextmanager
+
+# -----------------------------------------------------------------------------
+# 分阶段计时钩子 (Per-stage Timing Hooks)
+# -----------------------------------------------------------------------------
+# 引擎的几个主要阶段 (ingest / encode / aggregate / decompose / beam_search) 都包在
+# timed() 里。没有注册钩子时只多一次列表判断；注册后每个阶段结束都会回调
+# hook(stage, seconds)，便于 profiling 或把耗时上报到监控。
+# 阶段可以嵌套，例如传入 DataFrame 的 beam_search 会包含 encode + aggregate，
+# decompose_rate_mix / decompose_metrics 的 decompose 同样包含 encode + aggregate。
+
+STAGES = ("ingest", "encode", "aggregate", "decompose", "beam_search")
+
+_HOOKS = []
+
+
+def add_timing_hook(hook):
+    """Register ``hook(stage, seconds)``, called after every instrumented stage. Returns ``hook``."""
+    _HOOKS.append(hook)
+    return hook
+
+
+def remove_timing_hook(hook):
+    """Unregister a hook added with :func:`add_timing_hook` (no-op if it is not registered)."""
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
+
+
+@contextmanager
+def timed(stage):
+    """Time the enclosed block and report it to the registered hooks."""
+    if not _HOOKS:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for hook in list(_HOOKS):
+            hook(stage, elapsed)
+
+
+def timed_stage(stage):
+    """Decorator form of :func:`timed`."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _HOOKS:
+                return func(*args, **kwargs)
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class StageTimer:
+    """
+    Hook that accumulates call counts and total seconds per stage.
+
+    Use as a context manager to register it for the duration of a block::
+
+        with StageTimer() as timer:
+            beam_search(df_t0, df_t1, dims)
+        print(timer.frame())
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+
+    def __call__(self, stage, seconds):
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def __enter__(self):
+        return add_timing_hook(self)
+
+    def __exit__(self, *exc_info):
+        remove_timing_hook(self)
+
+    def frame(self):
+        """Per-stage ``calls`` / ``seconds`` table, in pipeline order."""
+        import pandas as pd
+
+        order = [stage for stage in STAGES if stage in self.seconds]
+        order += [stage for stage in self.seconds if stage not in order]
+        return pd.DataFrame({"calls": [self.calls[s] for s in order],
+                             "seconds": [self.seconds[s] for s in order]}, index=pd.Index(order, name="stage"))
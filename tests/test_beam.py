@@ -0,0 +1,209 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import attribution.beam
+import attribution.parallel
+from attribution import AttributionCube, beam_search, generate_period, synthetic_dimensions
+from attribution.parallel import ParallelExpander, release_shared
+
+DIMS = list(synthetic_dimensions(5, 6))
+
+
+@pytest.fixture(scope="module")
+def events():
+    return generate_period(20_000, "T0", 5, 6, seed=3), generate_period(20_000, "T1", 5, 6, seed=3)
+
+
+@pytest.mark.parametrize("max_depth", [None, 3])
+@pytest.mark.parametrize("direction", ["negative", "absolute"])
+def test_parallel_search_is_identical_to_serial(events, max_depth, direction):
+    serial = beam_search(*AttributionCube.build_pair(*events, DIMS, max_depth=max_depth), DIMS,
+                         max_depth=3, min_support=0.0, direction=direction)
+    # 第二次调用复用同一个进程池
+    for _ in range(2):
+        parallel = beam_search(*AttributionCube.build_pair(*events, DIMS, max_depth=max_depth), DIMS,
+                               max_depth=3, min_support=0.0, direction=direction, workers=2)
+        pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_expander_skips_the_pool_when_everything_is_materialized(events, monkeypatch):
+    cubes = AttributionCube.build_pair(*events, DIMS, max_depth=2)
+    monkeypatch.setattr("attribution.parallel.get_pool", lambda workers: pytest.fail("pool should not be used"))
+    children = ParallelExpander(*cubes, workers=2).expand_all([((("Channel", 1),), "Region"), ((), "User_Tag")])
+    assert [len(c0) for c0, _ in children] == [6, 6]
+
+
+def test_rolled_up_cuboids_match_serial_roll_ups(events):
+    lazy_t0, lazy_t1 = AttributionCube.build_pair(*events, DIMS)
+    reference, _ = AttributionCube.build_pair(*events, DIMS)
+    ParallelExpander(lazy_t0, lazy_t1, workers=2).prepare([["Channel", "Dim_5"], ["App_Version"]])
+    for dims in (["Channel", "Dim_5"], ["App_Version"]):
+        assert lazy_t0.is_materialized(dims)
+        pd.testing.assert_frame_equal(lazy_t0.frame(dims), reference.frame(dims))
+    release_shared(lazy_t0)
+    release_shared(lazy_t1)
+
+
+def test_lazy_cubes_are_shared_once_and_rolled_up_on_the_pool(events, monkeypatch):
+    shared, submitted = [], []
+    to_shared, get_pool = attribution.parallel._to_shared, attribution.parallel.get_pool
+    monkeypatch.setattr("attribution.parallel._to_shared", lambda cuboid: shared.append(cuboid) or
+                        to_shared(cuboid))
+
+    def counting_pool(workers):
+        pool = get_pool(workers)
+        submitted.append(workers)
+        return pool
+
+    monkeypatch.setattr("attribution.parallel.get_pool", counting_pool)
+    cubes = AttributionCube.build_pair(*events, DIMS)
+    first = beam_search(*cubes, DIMS, max_depth=3, workers=2)
+    # 第二次搜索：cuboid 已经物化，共享内存也不再重复拷贝
+    second = beam_search(*cubes, DIMS, max_depth=3, beam_width=5, workers=2)
+    assert submitted and all(workers == 2 for workers in submitted)
+    # 每个父 cuboid (两个 cube 的 base cuboid 以及后来复用的更细 cuboid) 只拷贝一次
+    assert len({id(cuboid) for cuboid in shared}) == len(shared)
+    assert [cuboid.dims for cuboid in shared].count(DIMS) == 2
+    serial_cubes = AttributionCube.build_pair(*events, DIMS)
+    pd.testing.assert_frame_equal(first, beam_search(*serial_cubes, DIMS, max_depth=3))
+    pd.testing.assert_frame_equal(second, beam_search(*serial_cubes, DIMS, max_depth=3, beam_width=5))
+
+
+def test_event_tables_build_only_the_cuboids_the_beam_visits(events, monkeypatch):
+    expected = beam_search(*AttributionCube.build_pair(*events, DIMS, max_depth=3), DIMS, max_depth=3)
+    monkeypatch.setattr(AttributionCube, "materialize", lambda self, max_depth: pytest.fail("eager materialize"))
+    pd.testing.assert_frame_equal(beam_search(*events, DIMS, max_depth=3), expected)
+
+
+SCRIPT = """
+import time
+from multiprocessing import shared_memory
+from attribution import AttributionCube, generate_period, synthetic_dimensions
+from attribution.parallel import ParallelExpander, get_pool, share_cuboid
+
+dims = list(synthetic_dimensions(3, 4))
+pool = get_pool(2)
+pool.submit(int).result()  # worker 先于任何共享内存段 fork 出来
+cubes = AttributionCube.build_pair(generate_period(1000, "T0", 3, 4), generate_period(1000, "T1", 3, 4), dims)
+ParallelExpander(*cubes, workers=2).prepare([["Channel"]])
+name = share_cuboid(cubes[0], cubes[0].base)[0]
+pool.shutdown()
+time.sleep(0.5)
+shared_memory.SharedMemory(name=name).close()
+print("ok")
+"""
+
+
+def test_shared_segments_outlive_workers_forked_before_them():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=root, capture_output=True, text=True, timeout=120)
+    assert result.stdout.strip() == "ok", result.stderr
+    assert "leaked" not in result.stderr
+
+
+def test_bootstrap_runs_once_per_depth(events, monkeypatch):
+    calls = []
+    bootstrap = attribution.beam.bootstrap_effects
+    monkeypatch.setattr("attribution.beam.bootstrap_effects",
+                        lambda *args, **kwargs: calls.append(kwargs["groups"]) or bootstrap(*args, **kwargs))
+    results = beam_search(*events, DIMS, max_depth=3, n_boot=200, rank_by="lower_bound")
+    assert len(calls) == 3
+    assert len(set(calls[0])) == len(DIMS)
+    assert (results["contribution_lo"] <= results["contribution"]).all()
+    assert (results["contribution"] <= results["contribution_hi"]).all()
+
+
+# -----------------------------------------------------------------------------
+# 暴力参照 (Brute-force pandas reference)
+# -----------------------------------------------------------------------------
+# 对每个节点直接在明细上过滤 + groupby，贡献度按全局分母计算，beam 逻辑逐行照抄。
+
+def brute_force_children(events, conditions, dim, numerator="clicks", denominator="impressions"):
+    """Contribution and support of every child of ``conditions`` along ``dim``, from the raw rows."""
+    frames = []
+    for df in events:
+        totals = df[[numerator, denominator]].sum()
+        for cond_dim, value in conditions:
+            df = df[df[cond_dim] == value]
+        grouped = df.groupby(dim, observed=True)[[numerator, denominator]].sum()
+        frames.append(pd.DataFrame({"ratio": grouped[numerator] / grouped[denominator],
+                                    "weight": grouped[denominator] / totals[denominator]}))
+    t0, t1 = frames[0].align(frames[1], join="outer", fill_value=0.0)
+    t0, t1 = t0.fillna(0.0), t1.fillna(0.0)
+    contribution = (t1["ratio"] - t0["ratio"]) * t1["weight"] + (t1["weight"] - t0["weight"]) * t0["ratio"]
+    return pd.DataFrame({"contribution": contribution, "support": np.maximum(t0["weight"], t1["weight"])})
+
+
+def brute_force_beam(events, dims, beam_width=3, max_depth=3, min_support=0.01, direction="negative"):
+    sign = {"negative": lambda c: -c, "positive": lambda c: c, "absolute": abs}[direction]
+    frontier, kept = [()], []
+    for depth in range(1, max_depth + 1):
+        candidates = {}
+        for conditions in frontier:
+            used = {cond_dim for cond_dim, _ in conditions}
+            for dim in (dim for dim in dims if dim not in used):
+                children = brute_force_children(events, conditions, dim)
+                for value, row in children.iterrows():
+                    score = sign(row["contribution"])
+                    key = frozenset(conditions + ((dim, value),))
+                    if row["support"] >= min_support and score > 0 and key not in candidates:
+                        candidates[key] = (score, conditions + ((dim, value),), row["contribution"])
+        beam = sorted(candidates.values(), key=lambda item: -item[0])[:beam_width]
+        kept += [(depth, frozenset(child), contribution) for _, child, contribution in beam]
+        frontier = [child for _, child, _ in beam]
+    return kept
+
+
+def as_rows(results):
+    return [(depth, frozenset(conditions), contribution)
+            for depth, conditions, contribution in results[["depth", "conditions", "contribution"]].itertuples(
+                index=False)]
+
+
+def assert_same_paths(actual, expected):
+    actual, expected = sorted(actual, key=lambda row: -abs(row[2])), sorted(expected, key=lambda row: -abs(row[2]))
+    assert [row[:2] for row in actual] == [row[:2] for row in expected]
+    np.testing.assert_allclose([row[2] for row in actual], [row[2] for row in expected], atol=1e-12)
+
+
+@pytest.mark.parametrize("direction", ["negative", "positive", "absolute"])
+def test_beam_search_matches_brute_force(events, direction):
+    results = beam_search(*events, DIMS, beam_width=4, max_depth=3, min_support=0.01, direction=direction)
+    assert_same_paths(as_rows(results), brute_force_beam(events, DIMS, beam_width=4, direction=direction))
+    if direction == "positive":
+        assert (results["contribution"] > 0).all()
+
+
+def test_depth_one_keeps_the_most_negative_single_dimension_nodes(events):
+    results = beam_search(*events, DIMS, beam_width=5, max_depth=1, min_support=0.0)
+    nodes = pd.concat([brute_force_children(events, (), dim).assign(dim=dim) for dim in DIMS])
+    expected = nodes.nsmallest(5, "contribution")
+    assert results["path"].tolist() == [f"{dim}={value}" for value, dim in zip(expected.index, expected["dim"])]
+    np.testing.assert_allclose(results["contribution"], expected["contribution"], atol=1e-12)
+
+
+def test_min_support_drops_low_share_nodes(events):
+    unfiltered = beam_search(*events, DIMS, beam_width=50, max_depth=2, min_support=0.0)
+    filtered = beam_search(*events, DIMS, beam_width=50, max_depth=2, min_support=0.05)
+    assert (filtered[["weight_t0", "weight_t1"]].max(axis=1) >= 0.05).all()
+    small = unfiltered[unfiltered[["weight_t0", "weight_t1"]].max(axis=1) < 0.05]
+    assert len(small) and not set(small["path"]) & set(filtered["path"])
+
+
+def test_permuted_paths_are_kept_once(events):
+    results = beam_search(*events, DIMS, beam_width=30, max_depth=3, min_support=0.0, direction="absolute")
+    keys = [frozenset(conditions) for conditions in results["conditions"]]
+    assert len(keys) == len(set(keys))
+    assert (results["depth"] == results["conditions"].map(len)).all()
+
+
+@pytest.mark.parametrize("kwargs", [{"direction": "down"}, {"rank_by": "upper_bound"},
+                                    {"rank_by": "lower_bound"}])
+def test_invalid_options_are_rejected(events, kwargs):
+    with pytest.raises(ValueError, match=next(iter(kwargs))):
+        beam_search(*events, DIMS, **kwargs)
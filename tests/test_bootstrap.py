@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from attribution import bootstrap_effects, decompose_arrays
+
+
+def make_counts(seed, nodes=8):
+    rng = np.random.default_rng(seed)
+    den = rng.integers(100, 5000, size=nodes)
+    return rng.binomial(den, 0.05), den
+
+
+def test_intervals_cover_the_point_estimate():
+    (num_t0, den_t0), (num_t1, den_t1) = make_counts(0), make_counts(1)
+    intervals = bootstrap_effects(num_t0, den_t0, num_t1, den_t1, n_boot=500, seed=0)
+    point = decompose_arrays(num_t0.astype(float), den_t0.astype(float), num_t1.astype(float), den_t1.astype(float))
+    for column in ("rate_effect", "mix_effect", "contribution"):
+        assert np.all(intervals[f"{column}_lo"] <= point[column] + 1e-12)
+        assert np.all(point[column] <= intervals[f"{column}_hi"] + 1e-12)
+
+
+def test_integer_valued_floats_are_counts():
+    (num_t0, den_t0), (num_t1, den_t1) = make_counts(2), make_counts(3)
+    bootstrap_effects(num_t0.astype(float), den_t0.astype(float), num_t1, den_t1,
+                      total_t0=(num_t0.sum() + 10.0, den_t0.sum() + 100.0), n_boot=10, seed=0)
+
+
+@pytest.mark.parametrize("position", range(4))
+def test_non_count_measures_are_rejected(position):
+    arrays = [*make_counts(4), *make_counts(5)]
+    arrays[position] = arrays[position] * 0.37  # e.g. cost
+    with pytest.raises(ValueError, match="count measures"):
+        bootstrap_effects(*arrays, n_boot=10, seed=0)
+
+
+def test_negative_values_are_rejected():
+    num_t0, den_t0 = make_counts(6)
+    with pytest.raises(ValueError, match="count measures"):
+        bootstrap_effects(-num_t0, den_t0, num_t0, den_t0, n_boot=10, seed=0)
+
+
+def test_one_group_is_the_plain_bootstrap():
+    (num_t0, den_t0), (num_t1, den_t1) = make_counts(7), make_counts(8)
+    totals = dict(total_t0=(num_t0.sum() + 50, den_t0.sum() + 900), total_t1=(num_t1.sum() + 40, den_t1.sum() + 800))
+    plain = bootstrap_effects(num_t0, den_t0, num_t1, den_t1, n_boot=200, seed=3, **totals)
+    grouped = bootstrap_effects(num_t0, den_t0, num_t1, den_t1, n_boot=200, seed=3,
+                                groups=np.zeros(len(num_t0), dtype=int), **totals)
+    for column, values in plain.items():
+        np.testing.assert_array_equal(grouped[column], values)
+
+
+def test_groups_are_bootstrapped_independently():
+    # 两组都是同一总体的划分 (b 是 a 两两合并后的粗划分)：一次分组 bootstrap ≈ 各自单独 bootstrap
+    a = [*make_counts(9, nodes=6), *make_counts(10, nodes=6)]
+    b = [array.reshape(3, 2).sum(axis=1) for array in a]
+    totals = {"total_t0": (a[0].sum(), a[1].sum()), "total_t1": (a[2].sum(), a[3].sum())}
+    grouped = bootstrap_effects(*[np.concatenate(pair) for pair in zip(a, b)], n_boot=4000, seed=0,
+                                groups=[0] * 6 + [1] * 3, **totals)
+    separate = [bootstrap_effects(*part, n_boot=4000, seed=1, **totals) for part in (a, b)]
+    width = np.concatenate([s["contribution_hi"] - s["contribution_lo"] for s in separate])
+    for column in ("contribution_lo", "contribution_hi"):
+        expected = np.concatenate([s[column] for s in separate])
+        assert np.all(np.abs(grouped[column] - expected) < 0.1 * width)
@@ -0,0 +1,95 @@
+import pytest
+
+from assistant.cache import AnswerCache, normalize_question, replay
+
+CONTEXT = "[Education]\nB.Sc. in Statistics"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+# -----------------------------------------------------------------------------
+# 规范化 / 回放
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("variant", ["What's your education?", "what's your EDUCATION", "  What’s your education!!",
+                                     "What‘s   your education ?"])
+def test_normalize_question_ignores_case_punctuation_and_apostrophes(variant):
+    assert normalize_question(variant) == "what's your education"
+
+
+def test_replay_yields_the_answer_unchanged():
+    answer = "I studied Statistics  at BIT.\nThen an M.Sc. at NTU."
+    chunks = list(replay(answer, words_per_chunk=2))
+    assert "".join(chunks) == answer
+    assert len(chunks) > 1
+
+
+# -----------------------------------------------------------------------------
+# 命中 / LRU / TTL
+# -----------------------------------------------------------------------------
+def test_hits_misses_and_hit_rate(clock):
+    cache = AnswerCache(clock=clock)
+    assert cache.get("What's your education?", CONTEXT) is None
+    cache.put("What's your education?", CONTEXT, "Statistics.")
+    assert cache.get("what’s your education", CONTEXT) == "Statistics."
+    assert cache.get("WHAT'S YOUR EDUCATION!", CONTEXT) == "Statistics."
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["lookups"], stats["size"]) == (2, 1, 3, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_a_different_context_misses(clock):
+    cache = AnswerCache(clock=clock)
+    cache.put("What's your education?", CONTEXT, "Statistics.")
+    assert cache.get("What's your education?", CONTEXT + "\nM.Sc. at NTU") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_empty_answers_are_not_cached(clock):
+    cache = AnswerCache(clock=clock)
+    cache.put("Hello?", CONTEXT, "")
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted_first(clock):
+    cache = AnswerCache(max_entries=2, clock=clock)
+    cache.put("first", CONTEXT, "1")
+    cache.put("second", CONTEXT, "2")
+    assert cache.get("first", CONTEXT) == "1"  # first 变成最近使用
+    cache.put("third", CONTEXT, "3")
+    assert cache.get("second", CONTEXT) is None
+    assert cache.get("first", CONTEXT) == "1"
+    assert cache.get("third", CONTEXT) == "3"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = AnswerCache(ttl_seconds=60, clock=clock)
+    cache.put("question", CONTEXT, "answer")
+    clock.now = 60
+    assert cache.get("question", CONTEXT) == "answer"
+    clock.now = 60.5
+    assert cache.get("question", CONTEXT) is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["misses"], stats["size"]) == (1, 1, 0)
+
+
+def test_put_refreshes_the_ttl(clock):
+    cache = AnswerCache(ttl_seconds=60, clock=clock)
+    cache.put("question", CONTEXT, "old")
+    clock.now = 50
+    cache.put("question", CONTEXT, "new")
+    clock.now = 100
+    assert cache.get("question", CONTEXT) == "new"
+    assert cache.stats()["expirations"] == 0
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from attribution import beam_search
+from attribution.cli import main
+from tests.test_engine import make_events
+
+
+def test_run_handles_periods_with_different_labels(tmp_path, capsys, monkeypatch):
+    df_t0 = make_events(50, n_rows=2000)
+    df_t1 = make_events(51, n_rows=2000)
+    df_t1 = df_t1[df_t1["Region"] != "Tier3"]  # T1 缺少一个标签，两周期字典需要对齐
+    df_t0.to_parquet(tmp_path / "t0.parquet")
+    df_t1.to_parquet(tmp_path / "t1.parquet")
+    materialized = []
+    monkeypatch.setattr("attribution.cube.AttributionCube.materialize",
+                        lambda self, max_depth: materialized.append(max_depth) or self)
+
+    dims = ["Channel", "Region", "User_Tag"]
+    assert main(["run", "--t0", str(tmp_path / "t0.parquet"), "--t1", str(tmp_path / "t1.parquet"),
+                 "--dims", ",".join(dims), "--min-support", "0", "--output", str(tmp_path / "out.csv")]) == 0
+    assert materialized == []
+    expected = beam_search(df_t0, df_t1, dims, min_support=0.0)
+    actual = pd.read_csv(tmp_path / "out.csv")
+    assert list(actual["path"]) == list(expected["path"])
+    assert "clicks/impressions" in capsys.readouterr().out
@@ -0,0 +1,177 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from assistant.client import LLMClient, RequestMetrics
+
+# -----------------------------------------------------------------------------
+# 本地 OpenAI 兼容 Stub Server
+# -----------------------------------------------------------------------------
+# 每个请求按脚本依次返回：
+#   503 / 429  错误状态码 (首个 token 之前的瞬时错误)
+#   "slow"     迟迟不发响应头，触发读超时
+#   "ok"       正常的 SSE 流 (或非流式 JSON)
+
+WORDS = ["stub", "answer", "about", "the", "resume"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, content_type, data=b""):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path != "/chat/completions":
+            return self._send(404, "application/json", b'{"error":{"message":"not found"}}')
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append(body)
+            action = server.script.pop(0) if server.script else "ok"
+        if isinstance(action, int):
+            return self._send(action, "application/json", b'{"error":{"message":"busy"}}')
+        if action == "slow":
+            time.sleep(server.slow_seconds)
+            self.close_connection = True
+            return
+        if not body.get("stream"):
+            completion = {"id": "x", "object": "chat.completion", "created": 0, "model": body["model"],
+                          "choices": [{"index": 0, "finish_reason": "stop",
+                                       "message": {"role": "assistant", "content": " ".join(WORDS)}}],
+                          "usage": {"prompt_tokens": 3, "completion_tokens": len(WORDS), "total_tokens": 8}}
+            return self._send(200, "application/json", json.dumps(completion).encode())
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        time.sleep(0.05)
+        for word in WORDS:
+            chunk = {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                     "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(0.01)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.script = []
+    server.slow_seconds = 1.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(base_url, **kwargs):
+    kwargs = {"connect_timeout": 1.0, "read_timeout": 5.0, "max_retries": 3, "backoff": 0.0, **kwargs}
+    return LLMClient("test-key", base_url=base_url, model="stub-model", **kwargs)
+
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+# -----------------------------------------------------------------------------
+# 重试 / 超时 / 指标
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("status", [503, 429])
+def test_stream_retries_transient_errors_before_the_first_token(stub, status):
+    stub.script = [status, status]
+    metrics = RequestMetrics()
+    text = "".join(make_client(stub.base_url).stream(MESSAGES, metrics=metrics))
+    assert text.split() == WORDS
+    assert metrics.attempts == 3
+    assert metrics.error is None
+    # 每次重试都用同一个模型
+    assert [body["model"] for body in stub.requests] == ["stub-model"] * 3
+
+
+def test_explicit_model_is_kept_across_retries(stub):
+    stub.script = [503]
+    make_client(stub.base_url).complete(MESSAGES, model="other-model")
+    assert [body["model"] for body in stub.requests] == ["other-model", "other-model"]
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script = [400]
+    metrics = RequestMetrics()
+    with pytest.raises(openai.BadRequestError):
+        list(make_client(stub.base_url).stream(MESSAGES, metrics=metrics))
+    assert metrics.attempts == 1
+    assert len(stub.requests) == 1
+    assert "BadRequestError" in metrics.error
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.script = [503] * 5
+    client = make_client(stub.base_url, max_retries=2)
+    with pytest.raises(openai.InternalServerError):
+        client.complete(MESSAGES)
+    assert len(stub.requests) == 3
+    assert client.stats()["errors"] == 1
+
+
+def test_read_timeout_is_retried(stub):
+    stub.script = ["slow"]
+    metrics = RequestMetrics()
+    text = "".join(make_client(stub.base_url, read_timeout=0.2).stream(MESSAGES, metrics=metrics))
+    assert text.split() == WORDS
+    assert metrics.attempts == 2
+
+
+def test_connect_timeout_is_configured_and_connection_errors_are_retried():
+    # 拿一个空闲端口再关掉，连接会被立即拒绝
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    client = make_client(f"http://127.0.0.1:{port}", connect_timeout=0.5, read_timeout=3.0, max_retries=1)
+    assert client.client.timeout.connect == 0.5
+    assert client.client.timeout.read == 3.0
+    metrics = RequestMetrics()
+    with pytest.raises(openai.APIConnectionError):
+        client.complete(MESSAGES, metrics=metrics)
+    assert metrics.attempts == 2
+
+
+def test_stream_fills_in_latency_metrics(stub):
+    client = make_client(stub.base_url)
+    metrics = RequestMetrics()
+    list(client.stream(MESSAGES, metrics=metrics))
+    assert metrics.attempts == 1
+    assert 0 < metrics.time_to_first_token < metrics.total_latency
+    assert metrics.completion_tokens > 0
+    assert metrics.tokens_per_second > 0
+    stats = client.stats()
+    assert stats["requests"] == 1 and stats["errors"] == 0
+    assert stats["median_time_to_first_token"] == metrics.time_to_first_token
+
+
+def test_complete_uses_reported_usage(stub):
+    metrics = RequestMetrics()
+    text = make_client(stub.base_url).complete(MESSAGES, metrics=metrics)
+    assert text.split() == WORDS
+    assert metrics.completion_tokens == len(WORDS)
+    assert metrics.total_latency >= metrics.time_to_first_token > 0
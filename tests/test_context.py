@@ -0,0 +1,79 @@
+import pytest
+
+from assistant.context import (DEFAULT_SUMMARY_TOKENS, ChatContext, _trim_to_tokens, estimate_tokens,
+                               extractive_summary, message_tokens)
+
+SYSTEM = "You are a helpful assistant."
+
+
+def make_messages(n_turns, words=40):
+    messages = []
+    for turn in range(n_turns):
+        messages.append({"role": "user", "content": f"Question {turn}. " + "detail " * words})
+        messages.append({"role": "assistant", "content": f"Answer {turn}. " + "fact " * words})
+    return messages
+
+
+def prompt_tokens(api_messages):
+    return estimate_tokens(api_messages[0]["content"]) + sum(message_tokens(m) for m in api_messages[1:])
+
+
+# -----------------------------------------------------------------------------
+# 截断 / 摘要
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("keep", ["start", "end"])
+def test_trim_falls_back_to_characters_when_no_line_fits(keep):
+    line = "x" * 400 + "y" * 400
+    trimmed = _trim_to_tokens(line, 50, keep=keep)
+    assert 0 < estimate_tokens(trimmed) <= 50
+    assert line.startswith(trimmed) if keep == "start" else line.endswith(trimmed)
+
+
+def test_trim_keeps_whole_lines_when_they_fit():
+    text = "\n".join(f"line {i} " + "word " * 10 for i in range(50))
+    trimmed = _trim_to_tokens(text, 40)
+    assert text.endswith(trimmed)
+    assert trimmed.startswith("line ")
+
+
+def test_extractive_summary_truncates_long_sentences_instead_of_dropping_them():
+    messages = [{"role": "user", "content": "a" * 2000}, {"role": "assistant", "content": "字" * 500 + "。 ok"}]
+    lines = extractive_summary("", messages).splitlines()
+    assert [line.split(":")[0] for line in lines] == ["- user", "- assistant"]
+    assert all(len(line) > len("- user: ") for line in lines)
+    assert estimate_tokens("\n".join(lines)) <= DEFAULT_SUMMARY_TOKENS
+
+
+# -----------------------------------------------------------------------------
+# Token 预算
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("budget", [600, 1500, 3000])
+def test_prompt_stays_within_the_budget_after_folding(budget):
+    context = ChatContext(token_budget=budget)
+    state = {}
+    messages = []
+    for turn in make_messages(20):
+        messages.append(turn)
+        api_messages = context.build(SYSTEM, messages, state)
+        assert prompt_tokens(api_messages) <= budget
+        assert api_messages[-1]["content"] == turn["content"]
+
+
+def test_summaries_longer_than_the_reserve_fold_more_turns():
+    context = ChatContext(token_budget=1200, summarize=lambda previous, messages: "summary " * 250,
+                          summary_tokens=50)
+    state = {}
+    messages = make_messages(10)
+    api_messages = context.build(SYSTEM, messages, state)
+    assert prompt_tokens(api_messages) <= 1200
+    assert len(api_messages) > 2
+    assert state["chat_summary"]["folded"] == len(messages) - (len(api_messages) - 1)
+
+
+def test_nothing_is_folded_while_the_history_fits():
+    calls = []
+    context = ChatContext(token_budget=3000, summarize=lambda previous, messages: calls.append(messages) or "")
+    messages = make_messages(2, words=5)
+    api_messages = context.build(SYSTEM, messages, {})
+    assert api_messages[1:] == messages
+    assert calls == []
@@ -0,0 +1,217 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import attribution.ingest
+from attribution import (AttributionCube, IncrementalAttribution, StageTimer, aggregate_period, attribute_periods,
+                         decompose_metrics, decompose_rate_mix, ingest_period, iter_batches)
+
+# -----------------------------------------------------------------------------
+# 参照实现 (Naive pandas groupby reference)
+# -----------------------------------------------------------------------------
+# 引擎的每条快速路径都和这里"逐节点 Python 循环"的朴素实现对账：
+#   W_i = den_i / Σ den,  R_i = num_i / den_i
+#   rate_i = (R1_i - R0_i) * W1_i,   mix_i = (W1_i - W0_i) * R0_i
+
+DIMS = {"Channel": ["Feed_Flow", "Search", "Video"], "Region": ["Tier1", "Tier2", "Tier3"],
+        "User_Tag": ["New_User", "Returning_User"]}
+
+
+def make_events(seed, n_rows=400, dims=DIMS):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({dim: rng.choice(labels, size=n_rows) for dim, labels in dims.items()})
+    df["impressions"] = rng.integers(1, 50, size=n_rows)
+    df["clicks"] = rng.binomial(df["impressions"], 0.05)
+    df["conversions"] = rng.binomial(df["clicks"], 0.3)
+    df["cost"] = rng.uniform(0.1, 5.0, size=n_rows).round(2)
+    return df
+
+
+def naive_effects(df_t0, df_t1, dims, numerator="clicks", denominator="impressions"):
+    g0 = df_t0.groupby(dims)[[numerator, denominator]].sum()
+    g1 = df_t1.groupby(dims)[[numerator, denominator]].sum()
+    total_t0, total_t1 = g0[denominator].sum(), g1[denominator].sum()
+    rows = {}
+    for key in g0.index.union(g1.index):
+        n0, d0 = g0.loc[key].tolist() if key in g0.index else (0.0, 0.0)
+        n1, d1 = g1.loc[key].tolist() if key in g1.index else (0.0, 0.0)
+        r0 = n0 / d0 if d0 else 0.0
+        r1 = n1 / d1 if d1 else 0.0
+        w0, w1 = d0 / total_t0, d1 / total_t1
+        rows[key] = {"ratio_t0": r0, "ratio_t1": r1, "weight_t0": w0, "weight_t1": w1,
+                     "rate_effect": (r1 - r0) * w1, "mix_effect": (w1 - w0) * r0,
+                     "contribution": (r1 - r0) * w1 + (w1 - w0) * r0}
+    expected = pd.DataFrame.from_dict(rows, orient="index")
+    expected.index = g0.index.union(g1.index)
+    return expected
+
+
+def assert_matches(actual, expected):
+    actual = actual.sort_index()
+    expected = expected.sort_index()
+    assert list(actual.index) == list(expected.index)
+    for column in expected:
+        np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy(), atol=1e-12)
+
+
+# -----------------------------------------------------------------------------
+# Rate/Mix 分解
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("dims", [["Channel"], ["Channel", "Region"], list(DIMS)])
+def test_decompose_rate_mix_matches_naive_groupby(dims):
+    df_t0, df_t1 = make_events(0), make_events(1)
+    assert_matches(decompose_rate_mix(df_t0, df_t1, dims), naive_effects(df_t0, df_t1, dims))
+
+
+def test_effects_add_up_to_global_change():
+    df_t0, df_t1 = make_events(2), make_events(3)
+    effects = decompose_rate_mix(df_t0, df_t1, list(DIMS))
+    delta = df_t1["clicks"].sum() / df_t1["impressions"].sum() - df_t0["clicks"].sum() / df_t0["impressions"].sum()
+    assert effects["contribution"].sum() == pytest.approx(delta, abs=1e-12)
+
+
+def test_nodes_missing_in_one_period_are_kept():
+    df_t0 = make_events(4)
+    df_t1 = make_events(5)
+    df_t1 = df_t1[df_t1["Channel"] != "Video"]
+    effects = decompose_rate_mix(df_t0, df_t1, ["Channel", "Region"])
+    assert_matches(effects, naive_effects(df_t0, df_t1, ["Channel", "Region"]))
+    assert (effects.loc["Video", "weight_t1"] == 0).all()
+
+
+def test_decompose_metrics_matches_each_metric_on_its_own():
+    df_t0, df_t1 = make_events(6), make_events(7)
+    metrics = {"CTR": ("clicks", "impressions"), "CVR": ("conversions", "clicks"), "CPA": ("cost", "conversions")}
+    results = decompose_metrics(df_t0, df_t1, ["Channel", "Region"], metrics)
+    for name, (numerator, denominator) in metrics.items():
+        assert_matches(results[name], naive_effects(df_t0, df_t1, ["Channel", "Region"], numerator, denominator))
+
+
+def test_stage_timer_reports_the_group_by_as_aggregate():
+    with StageTimer() as timer:
+        decompose_rate_mix(make_events(6), make_events(7), ["Channel", "Region"])
+    assert timer.calls == {"encode": 2, "aggregate": 1, "decompose": 1}
+    assert timer.seconds["aggregate"] <= timer.seconds["decompose"]
+
+
+# -----------------------------------------------------------------------------
+# 多周期 / 增量 / Cube
+# -----------------------------------------------------------------------------
+def test_attribute_periods_matches_each_consecutive_pair():
+    frames = [make_events(10 + day).assign(day=f"2026-01-0{day + 1}") for day in range(4)]
+    long = attribute_periods(pd.concat(frames, ignore_index=True), "day", ["Channel", "Region"])
+    for day in range(3):
+        pair = long[long["period_t0"] == f"2026-01-0{day + 1}"]
+        assert (pair["period_t1"] == f"2026-01-0{day + 2}").all()
+        assert_matches(pair.set_index(["Channel", "Region"]), naive_effects(frames[day], frames[day + 1],
+                                                                            ["Channel", "Region"]))
+
+
+def test_attribute_periods_follows_the_explicit_order():
+    labels = ["Mon", "Tue", "Wed", "Thu"]  # 字母序不是时间顺序
+    frames = [make_events(10 + day).assign(day=label) for day, label in enumerate(labels)]
+    events = pd.concat(frames + [make_events(30).assign(day="Fri")], ignore_index=True)
+    long = attribute_periods(events, "day", ["Channel"], periods=labels)
+    assert list(dict.fromkeys(zip(long["period_t0"], long["period_t1"]))) == list(zip(labels, labels[1:]))
+    for day in range(3):
+        pair = long[long["period_t0"] == labels[day]].set_index("Channel")
+        assert_matches(pair, naive_effects(frames[day], frames[day + 1], ["Channel"]))
+
+
+def test_attribute_periods_flags_skips_or_fills_absent_periods():
+    frames = {day: make_events(10 + day).assign(day=f"2026-01-0{day}") for day in (1, 2, 4)}
+    events = pd.concat(frames.values(), ignore_index=True)
+    days = [f"2026-01-0{day}" for day in range(1, 5)]
+    with pytest.raises(ValueError, match="2026-01-03"):
+        attribute_periods(events, "day", ["Channel"], periods=days)
+    # 分类列里声明了但没有数据的周期同样会被发现
+    with pytest.raises(ValueError, match="2026-01-03"):
+        attribute_periods(events.astype({"day": pd.CategoricalDtype(days, ordered=True)}), "day", ["Channel"])
+
+    skipped = attribute_periods(events, "day", ["Channel"], periods=days, missing="skip")
+    assert set(zip(skipped["period_t0"], skipped["period_t1"])) == {(days[0], days[1]), (days[1], days[3])}
+    assert_matches(skipped[skipped["period_t0"] == days[1]].set_index("Channel"),
+                   naive_effects(frames[2], frames[4], ["Channel"]))
+
+    zeros = attribute_periods(events, "day", ["Channel"], periods=days, missing="zero")
+    assert set(zip(zeros["period_t0"], zeros["period_t1"])) == set(zip(days, days[1:]))
+    into_gap = zeros[zeros["period_t1"] == days[2]]
+    assert (into_gap["den_t1"] == 0).all() and (into_gap["weight_t1"] == 0).all()
+
+
+def test_attribute_periods_rejects_bad_options():
+    events = make_events(10).assign(day="2026-01-01")
+    with pytest.raises(ValueError, match="missing"):
+        attribute_periods(events, "day", ["Channel"], missing="fill")
+    with pytest.raises(ValueError, match="unique"):
+        attribute_periods(events, "day", ["Channel"], periods=["2026-01-01", "2026-01-01"])
+
+def test_incremental_matches_full_recompute_over_the_window():
+    baseline = make_events(20)
+    batches = [make_events(21 + i, n_rows=100) for i in range(6)]
+    tracker = IncrementalAttribution(baseline, ["Channel", "Region"], window=3)
+    for timestamp, batch in enumerate(batches):
+        tracker.update(batch, timestamp)
+        window = pd.concat(batches[max(0, timestamp - 2):timestamp + 1], ignore_index=True)
+        expected = naive_effects(baseline, window, ["Channel", "Region"])
+        actual = tracker.effects()
+        assert_matches(actual[actual["den_t0"] + actual["den_t1"] > 0], expected)
+
+
+@pytest.mark.parametrize("direction", ["negative", "positive", "absolute"])
+def test_incremental_top_contributors(direction):
+    baseline, batch = make_events(25), make_events(26)
+    tracker = IncrementalAttribution(baseline, ["Channel", "Region"])
+    tracker.update(batch, 0)
+    contribution = naive_effects(baseline, batch, ["Channel", "Region"])["contribution"]
+    score = {"negative": -contribution, "positive": contribution, "absolute": contribution.abs()}[direction]
+    top = tracker.top_contributors(k=3, direction=direction)
+    assert list(top.index) == list(score.sort_values(ascending=False, kind="stable").index[:3])
+
+
+def test_incremental_rejects_unknown_direction():
+    tracker = IncrementalAttribution(make_events(27), ["Channel"])
+    with pytest.raises(ValueError, match="direction"):
+        tracker.top_contributors(direction="down")
+
+
+def test_cube_lookups_match_naive_groupby():
+    df_t0, df_t1 = make_events(30), make_events(31)
+    cube_t0, _ = AttributionCube.build_pair(df_t0, df_t1, list(DIMS), max_depth=2)
+    conditions = (("Channel", "Search"),)
+    expected = df_t0[df_t0["Channel"] == "Search"].groupby("Region")[["clicks", "impressions"]].sum()
+    children = cube_t0.children(conditions, "Region")
+    np.testing.assert_allclose(children.loc[expected.index, ["clicks", "impressions"]].to_numpy(),
+                               expected.to_numpy())
+    node = cube_t0.node(conditions + (("User_Tag", "New_User"),))
+    subset = df_t0[(df_t0["Channel"] == "Search") & (df_t0["User_Tag"] == "New_User")]
+    assert tuple(node) == pytest.approx((subset["clicks"].sum(), subset["impressions"].sum()))
+
+
+# -----------------------------------------------------------------------------
+# 流式读取
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("compact_every", [None, 40])
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_ingest_matches_aggregate_period(tmp_path, monkeypatch, suffix, compact_every):
+    df = make_events(40, n_rows=2000)
+    # 看起来像数字的标签必须仍然按字符串处理
+    df["Version"] = np.random.default_rng(41).choice(["1.5", "2.0", "10"], size=len(df))
+    path = tmp_path / f"events{suffix}"
+    df.to_csv(path, index=False) if suffix == ".csv" else df.to_parquet(path, row_group_size=500)
+
+    dims = ["Version", "Channel", "Region"]
+    batches = list(iter_batches(path, dims + ["clicks", "impressions"], batch_size=150, text_columns=dims))
+    assert max(batch.num_rows for batch in batches) <= 150
+    assert sum(batch.num_rows for batch in batches) == len(df)
+
+    compactions = []
+    compact = attribution.ingest._compact
+    monkeypatch.setattr("attribution.ingest._compact",
+                        lambda partials, *args: compactions.append(len(partials)) or compact(partials, *args))
+    actual = ingest_period(path, dims, batch_size=150, compact_every=compact_every)
+    expected = aggregate_period(df, dims)
+    assert list(actual.index) == list(expected.index)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy())
+    # 部分结果在循环内就被折叠进累加器 (不止最后一次)
+    assert len(compactions) > 1
@@ -0,0 +1,80 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+from assistant.retrieval import BM25Index, format_sections, split_sections, tokenize
+
+
+def load_resume():
+    """``RESUME_CONTENT`` of app.py, read without running the Streamlit script."""
+    tree = ast.parse(Path(__file__).resolve().parents[1].joinpath("app.py").read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and [target.id for target in node.targets] == ["RESUME_CONTENT"]:
+            return ast.literal_eval(node.value)
+    raise LookupError("RESUME_CONTENT not found in app.py")
+
+
+RESUME = load_resume()
+TITLES = ["Profile", "Contact", "Education", "Experience", "Projects", "Skills"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return BM25Index(split_sections(RESUME))
+
+
+def titles(sections):
+    return [title for title, _ in sections]
+
+
+# -----------------------------------------------------------------------------
+# 切分 / 渲染
+# -----------------------------------------------------------------------------
+def test_split_sections_follows_the_title_lines():
+    sections = split_sections(RESUME)
+    assert titles(sections) == TITLES
+    assert sections[0][1].startswith("My name is")
+    assert dict(sections)["Skills"].startswith("Python, SQL")
+    assert all(body == body.strip() and "[" + title + "]" not in body for title, body in sections)
+
+
+def test_split_sections_without_headers_or_preamble():
+    assert split_sections("  just a paragraph \n") == [("Profile", "just a paragraph")]
+    assert split_sections("[A]\none\n[Empty]\n\n[B]\ntwo") == [("A", "one"), ("B", "two")]
+    assert split_sections("") == []
+
+
+def test_format_sections_reproduces_the_resume_layout():
+    assert format_sections(split_sections(RESUME)) == RESUME.strip()
+    assert format_sections([("Profile", "Hi."), ("Skills", "SQL")]) == "Hi.\n\n[Skills]\nSQL"
+
+
+def test_tokenize_drops_stop_words_and_plural_s():
+    assert tokenize("What are your Projects and skills?") == ["project", "skill"]
+    assert tokenize("class 数据") == ["class", "数", "据"]
+
+
+# -----------------------------------------------------------------------------
+# 检索
+# -----------------------------------------------------------------------------
+def test_education_question_lands_on_education(index):
+    assert titles(index.search("What's your education?")) == ["Profile", "Education"]
+
+
+def test_red_question_lands_on_experience(index):
+    assert titles(index.search("Tell me about the RED experience", k=1)) == ["Profile", "Experience"]
+    assert "Experience" in titles(index.search("Tell me about the RED experience"))
+
+
+def test_questions_without_matches_fall_back_to_the_full_resume(index):
+    assert index.search("Tell me about yourself") == split_sections(RESUME)
+
+
+def test_results_are_pinned_and_in_resume_order(index):
+    # Skills 的得分高于 Projects，但结果仍按简历顺序排列
+    sections = index.search("skills SQL Python projects", k=2)
+    assert titles(sections) == ["Profile", "Projects", "Skills"]
+    assert titles(BM25Index(split_sections(RESUME), pinned=()).search("education", k=1)) == ["Education"]
+    assert titles(BM25Index(split_sections(RESUME), pinned=("Contact",)).search("education", k=1)) == \
+        ["Contact", "Education"]
@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from attribution import (DEMO_DIMENSIONS, decompose_rate_mix, demo_events, generate_period, summarize_effects,
+                         write_period)
+
+
+def test_demo_events_reproduce_the_demo_scenario():
+    events_t0, events_t1 = demo_events("T0"), demo_events("T1")
+    assert len(events_t0) == len(events_t1) == 2 ** len(DEMO_DIMENSIONS)
+    assert (events_t0["impressions"].sum(), events_t1["impressions"].sum()) == (100_000, 120_000)
+    summary = summarize_effects(decompose_rate_mix(events_t0, events_t1, ["Channel"]))
+    assert summary["ratio_t0"] == pytest.approx(0.05001)
+    assert summary["ratio_t1"] == pytest.approx(0.03785)
+    assert summary["mix_effect"] < summary["rate_effect"] < 0
+
+
+@pytest.mark.parametrize("period", ["T0", "T1"])
+def test_generated_events_follow_the_demo_scenario(period):
+    expected = demo_events(period).groupby("Channel")[["clicks", "impressions"]].sum()
+    sampled = generate_period(200_000, period, seed=1).groupby("Channel", observed=True)[["clicks", "impressions"]].sum()
+    share = sampled["impressions"] / sampled["impressions"].sum()
+    ctr = sampled["clicks"] / sampled["impressions"]
+    assert share.to_numpy() == pytest.approx((expected["impressions"] / expected["impressions"].sum()).to_numpy(),
+                                             abs=0.01)
+    assert ctr.to_numpy() == pytest.approx((expected["clicks"] / expected["impressions"]).to_numpy(), rel=0.03)
+
+
+def test_demo_events_reject_unknown_periods():
+    with pytest.raises(ValueError, match="period"):
+        demo_events("T2")
+
+
+def test_empty_periods_keep_their_column_types(tmp_path):
+    reference = generate_period(10, "T1", seed=1)
+    empty = generate_period(0, "T1", seed=1)
+    assert len(empty) == 0
+    assert empty.dtypes.equals(reference.dtypes)
+    path = write_period(tmp_path / "empty.parquet", 0, "T1")
+    written = pd.read_parquet(path)
+    assert len(written) == 0
+    assert list(written.columns) == list(reference.columns)
+
+
+def test_negative_row_counts_are_rejected():
+    with pytest.raises(ValueError, match="n_rows"):
+        generate_period(-1)